@@ -0,0 +1,136 @@
+# conci-ai-assistant/backend/benchmarks/asr_profiles.py
+# Benchmarks the ASR decoding profiles (settings.ASR_PROFILES) on a local set of sample recordings,
+# reporting real-time factor (processing time / audio duration) and word error rate per profile.
+#
+# Each recording (WAV or Ogg Opus) needs a reference transcript next to it with the same name
+# and a .txt extension, e.g. samples/towels_305.wav + samples/towels_305.txt.
+#
+# Usage (from the backend/ directory):
+#   python -m benchmarks.asr_profiles --samples benchmarks/samples
+#   python -m benchmarks.asr_profiles --samples benchmarks/samples --profiles fast balanced
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from src.core.config import settings
+from src.services.ai_models import AIService
+from src.services.audio_decoder import StreamingAudioDecoder, TARGET_SAMPLE_RATE
+
+AUDIO_EXTENSIONS = (".wav", ".ogg", ".opus")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercases and strips punctuation so WER only counts word differences."""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_edit_distance(reference: List[str], hypothesis: List[str]) -> int:
+    """Levenshtein distance over words (substitutions + deletions + insertions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, start=1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp_word in enumerate(hypothesis, start=1):
+            current[j] = min(
+                previous[j] + 1, # Deletion
+                current[j - 1] + 1, # Insertion
+                previous[j - 1] + (ref_word != hyp_word), # Substitution
+            )
+        previous = current
+    return previous[-1]
+
+
+def load_samples(samples_dir: str, max_duration_seconds: float) -> List[Tuple[str, np.ndarray, str]]:
+    """Decodes every recording in samples_dir that has a reference transcript."""
+    samples = []
+    for name in sorted(os.listdir(samples_dir)):
+        stem, extension = os.path.splitext(name)
+        transcript_path = os.path.join(samples_dir, stem + ".txt")
+        if extension.lower() not in AUDIO_EXTENSIONS or not os.path.exists(transcript_path):
+            continue
+        with open(os.path.join(samples_dir, name), "rb") as f:
+            audio_bytes = f.read()
+        decoder = StreamingAudioDecoder(max_bytes=len(audio_bytes), max_duration_seconds=max_duration_seconds)
+        decoder.feed(audio_bytes)
+        with open(transcript_path, encoding="utf-8") as f:
+            reference = f.read().strip()
+        samples.append((name, decoder.finish(), reference))
+    return samples
+
+
+def benchmark_profile(service: AIService, profile_name: str, samples, warmup: bool) -> dict:
+    """Transcribes every sample with one profile and aggregates RTF and WER."""
+    profile = settings.ASR_PROFILES[profile_name]
+    if warmup:
+        service.transcribe_array(samples[0][1], profile)
+
+    total_audio_seconds = 0.0
+    total_processing_seconds = 0.0
+    total_errors = 0
+    total_reference_words = 0
+    for name, audio, reference in samples:
+        start = time.perf_counter()
+        hypothesis = service.transcribe_array(audio, profile)
+        elapsed = time.perf_counter() - start
+
+        reference_words = normalize_words(reference)
+        errors = word_edit_distance(reference_words, normalize_words(hypothesis))
+        total_audio_seconds += len(audio) / TARGET_SAMPLE_RATE
+        total_processing_seconds += elapsed
+        total_errors += errors
+        total_reference_words += len(reference_words)
+        print(f"  [{profile_name}] {name}: {elapsed:.2f}s, {errors} word errors -> '{hypothesis.strip()}'")
+
+    return {
+        "profile": profile_name,
+        "clips": len(samples),
+        "audio_seconds": total_audio_seconds,
+        "rtf": total_processing_seconds / total_audio_seconds if total_audio_seconds else 0.0,
+        "wer": total_errors / total_reference_words if total_reference_words else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ASR decoding profiles (real-time factor and WER).")
+    parser.add_argument("--samples", default=os.path.join(os.path.dirname(__file__), "samples"),
+                        help="Directory of recordings with matching .txt reference transcripts.")
+    parser.add_argument("--profiles", nargs="+", default=sorted(settings.ASR_PROFILES),
+                        help="Profiles to benchmark (default: all configured profiles).")
+    parser.add_argument("--max-duration", type=float, default=600.0,
+                        help="Maximum duration in seconds of a single recording.")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the untimed warm-up transcription.")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.profiles if name not in settings.ASR_PROFILES]
+    if unknown:
+        parser.error(f"Unknown profile(s): {', '.join(unknown)}")
+    if not os.path.isdir(args.samples):
+        parser.error(f"Samples directory not found: {args.samples}")
+
+    samples = load_samples(args.samples, args.max_duration)
+    if not samples:
+        print(f"No recordings with reference transcripts found in {args.samples}.")
+        return 1
+    print(f"Loaded {len(samples)} recordings from {args.samples}.")
+
+    service = AIService()
+    service.load_whisper_model()
+
+    results = [benchmark_profile(service, name, samples, warmup=not args.no_warmup) for name in args.profiles]
+
+    print()
+    print(f"Whisper model: {settings.WHISPER_MODEL_SIZE}")
+    print(f"{'profile':<12}{'clips':>7}{'audio (s)':>12}{'RTF':>8}{'WER':>8}")
+    for result in results:
+        print(f"{result['profile']:<12}{result['clips']:>7}{result['audio_seconds']:>12.1f}"
+              f"{result['rtf']:>8.3f}{result['wer']:>8.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
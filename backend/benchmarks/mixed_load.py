@@ -0,0 +1,152 @@
+# conci-ai-assistant/backend/benchmarks/mixed_load.py
+# Measures throughput under mixed concurrent ASR/LLM/TTS load, before and after CPU partitioning.
+#
+# "before": each stage's calls run one at a time on that stage's own worker thread, as in the
+#           "after" run, but with torch's default thread pools (each sized to every core), which
+#           is how concurrent stages oversubscribe the CPU. Per-stage serialization is the same
+#           in both runs, so the difference measured is the thread budgets and core affinity.
+# "after":  the same calls go through ResourceManager (per-stage thread budgets, optional
+#           core affinity, queue-depth rebalancing) configured from settings.STAGE_RESOURCES.
+#
+# The stages are emulated with torch kernels shaped like each model's hot loop, so the benchmark
+# runs without downloading Whisper, Mistral or Coqui weights.
+#
+# Usage (from the backend/ directory):
+#   python -m benchmarks.mixed_load --requests 48 --concurrency 8
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from src.core.config import settings
+from src.services.resource_manager import ResourceManager, available_cpu_count
+
+
+def make_stage_kernels(scale: int):
+    """Builds CPU-bound stand-ins for the three model stages."""
+    asr_weights = torch.randn(768, 768)
+    asr_input = torch.randn(scale * 150, 768) # Encoder-style: one large batch of frames
+    llm_weights = torch.randn(2048, 2048)
+    llm_state = torch.randn(scale, 2048) # Decoder-style: many small sequential steps
+    tts_kernel = torch.randn(256, 80, 9)
+    tts_input = torch.randn(1, 80, scale * 200)
+
+    def asr():
+        with torch.no_grad():
+            hidden = asr_input
+            for _ in range(6):
+                hidden = torch.tanh(hidden @ asr_weights)
+            return float(hidden.sum())
+
+    def llm():
+        with torch.no_grad():
+            state = llm_state
+            for _ in range(24):
+                state = torch.tanh(state @ llm_weights)
+            return float(state.sum())
+
+    def tts():
+        with torch.no_grad():
+            return float(torch.nn.functional.conv1d(tts_input, tts_kernel, padding=4).sum())
+
+    return {"asr": asr, "llm": llm, "tts": tts}
+
+
+async def voice_request(run_stage):
+    """A /voice_command/ round trip: ASR, then LLM, then TTS."""
+    await run_stage("asr")
+    await run_stage("llm")
+    await run_stage("tts")
+
+
+async def text_request(run_stage):
+    """A /text_command/ round trip: LLM only."""
+    await run_stage("llm")
+
+
+async def run_mixed_load(run_stage, total_requests: int, concurrency: int) -> float:
+    """Runs an interleaved mix of voice and text requests; returns requests per second."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        async with semaphore:
+            await (voice_request if index % 2 == 0 else text_request)(run_stage)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total_requests)))
+    return total_requests / (time.perf_counter() - start)
+
+
+async def benchmark(args) -> int:
+    kernels = make_stage_kernels(args.scale)
+    for kernel in kernels.values():
+        kernel() # Warm up allocations and torch's thread pools
+
+    stage_executors = {stage: ThreadPoolExecutor(max_workers=1) for stage in kernels}
+
+    async def unmanaged(stage):
+        return await asyncio.get_running_loop().run_in_executor(stage_executors[stage], kernels[stage])
+
+    manager = ResourceManager(enabled=True)
+    observed_threads = {stage: [] for stage in kernels} # (threads at call start, threads at call end)
+
+    def observed(stage):
+        # torch.set_num_threads is partly process-wide, so record what each stage actually ran with.
+        threads_at_start = torch.get_num_threads()
+        result = kernels[stage]()
+        observed_threads[stage].append((threads_at_start, torch.get_num_threads()))
+        return result
+
+    async def managed(stage):
+        return await manager.run(stage, observed, stage)
+
+    print(f"Cores available: {available_cpu_count()}, torch default threads: {torch.get_num_threads()}")
+    print(f"Stage budgets: {manager.base_budgets()} (rebalance: {manager.rebalance})")
+    print(f"Mixed load: {args.requests} requests (half voice, half text), concurrency {args.concurrency}")
+
+    before = await run_mixed_load(unmanaged, args.requests, args.concurrency)
+    for executor in stage_executors.values():
+        executor.shutdown()
+    # Process-wide limits are applied only now so they cannot skew the "before" run.
+    # (torch may refuse a new inter-op size after the warm-up; the manager just warns.)
+    manager.configure_process()
+    after = await run_mixed_load(managed, args.requests, args.concurrency)
+    manager.shutdown()
+
+    print()
+    print(f"{'mode':<10}{'req/s':>10}")
+    print(f"{'before':<10}{before:>10.2f}")
+    print(f"{'after':<10}{after:>10.2f}")
+    print(f"Speed-up: {after / before:.2f}x")
+
+    print()
+    print("Observed torch threads per stage in the 'after' run (budgets are best-effort while stages overlap):")
+    print(f"{'stage':<8}{'calls':>7}{'at start':>12}{'at end':>10}{'changed mid-call':>18}")
+    for stage, samples in observed_threads.items():
+        if not samples:
+            continue
+        starts = [start for start, _ in samples]
+        ends = [end for _, end in samples]
+        changed = sum(1 for start, end in samples if start != end)
+        print(f"{stage:<8}{len(samples):>7}{f'{min(starts)}-{max(starts)}':>12}"
+              f"{f'{min(ends)}-{max(ends)}':>10}{changed:>18}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Throughput under mixed concurrent load, with and without CPU partitioning.")
+    parser.add_argument("--requests", type=int, default=48, help="Total requests to run in each mode.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once.")
+    parser.add_argument("--scale", type=int, default=4, help="Work per stage call (larger = longer calls).")
+    args = parser.parse_args(argv)
+    if not settings.RESOURCE_MANAGER_ENABLED:
+        print("Note: RESOURCE_MANAGER_ENABLED is false in settings; the benchmark enables it for the 'after' run.")
+    return asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
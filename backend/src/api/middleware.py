@@ -0,0 +1,75 @@
+# conci-ai-assistant/backend/src/api/middleware.py
+# This file defines ASGI middleware shared by the API routers.
+
+from typing import Iterable
+
+from starlette.responses import JSONResponse
+
+# Allowance for multipart boundaries, part headers and small form fields on top of the audio itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects oversized request bodies on the given paths before the application reads them.
+    FastAPI parses (and spools) the whole multipart body before a route handler runs, so the
+    limit has to be enforced at the ASGI level:
+    - a declared Content-Length above the limit is answered with 413 without reading the body;
+    - for chunked uploads the received bytes are counted, and the body stops being read
+      once the limit is crossed; whatever response the app produces is then replaced by a 413.
+    """
+    def __init__(self, app, max_body_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    exceeded = True
+                    return {"type": "http.disconnect"} # Stop reading; the app sees a dropped client
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._reject(scope, receive, send)
+                return # Drop the app's own response to the truncated body
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded: # Errors caused by the truncated body are answered with the 413 below
+                raise
+        if exceeded and not response_started:
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body is larger than the maximum allowed size of {self.max_body_bytes} bytes."},
+        )
+        await response(scope, receive, send)
@@ -6,7 +6,7 @@ from typing import List, Optional
 from datetime import datetime
 
 # Import models for tasks and staff
-from ...core.models import Task, TaskUpdateRequest, StaffMember, OperationResponse
+from ...core.models import Task, TaskCreateRequest, TaskUpdateRequest, StaffMember, OperationResponse
 
 # Import the TaskManager service
 from ...services.task_manager import task_manager
@@ -31,6 +31,15 @@ async def get_all_tasks_api():
             detail=f"Failed to retrieve tasks: {str(e)}"
         )
 
+@router.post("/tasks/", response_model=Task, status_code=status.HTTP_201_CREATED, summary="Create a task directly")
+async def create_task_api(request: TaskCreateRequest):
+    """
+    Creates a new task from an already structured guest request.
+    Used by tools that detect tasks outside the voice/text endpoints,
+    such as the offline batch replay pipeline (python -m src.batch).
+    """
+    return task_manager.create_task(request)
+
 @router.get("/tasks/{task_id}", response_model=Task, summary="Get a specific task by ID")
 async def get_task_by_id_api(task_id: str):
     """
@@ -2,13 +2,16 @@
 # This file defines API endpoints related to voice interaction and AI processing,
 # now integrated with task creation for the dashboard.
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from typing import Optional
 from fastapi.responses import JSONResponse
 import base64
 import io
 
 # Import the AI service and Pydantic models
 from ...services.ai_models import ai_service
+from ...services.audio_decoder import decode_upload
+from ...core.exceptions import AudioDecodeError, UnsupportedAudioFormat, AudioLimitExceeded, UnknownASRProfile
 from ...core.models import VoiceCommandResponse, TextCommandRequest, TextCommandResponse, OperationResponse
 
 # Import the TaskManager service
@@ -18,17 +21,26 @@ from ...services.task_manager import task_manager # NEW IMPORT
 router = APIRouter()
 
 @router.post("/voice_command/", response_model=VoiceCommandResponse, summary="Process a voice command through ASR, LLM, and TTS")
-async def process_voice_command_api(audio_file: UploadFile = File(...)):
+async def process_voice_command_api(
+    audio_file: UploadFile = File(...),
+    asr_profile: Optional[str] = Form(None, description="ASR decoding profile (e.g. 'fast', 'balanced', 'accurate')."),
+    device_id: Optional[str] = Form(None, description="ID of the sending room device, used to pick its configured ASR profile."),
+):
     """
     **Endpoint to process a full voice command.**
 
     Receives an audio file (e.g., from ESP32 or frontend), performs the following:
+    0.  **Decoding:** Streams the upload (WAV PCM, WAV IMA-ADPCM or Ogg Opus) into a 16 kHz buffer,
+        rejecting uploads that exceed the configured size or duration limits.
     1.  **ASR (Automatic Speech Recognition):** Transcribes the audio to text using the AI service.
     2.  **LLM (Large Language Model):** Processes the transcribed text to generate an intelligent text response
         and attempts to identify if a structured task needs to be created.
     3.  **Task Creation:** If a task is identified by the LLM, it's created via the TaskManager.
     4.  **TTS (Text-to-Speech):** Synthesizes speech from the LLM's text response.
 
+    The ASR decoding profile can be selected with the optional `asr_profile` form field;
+    otherwise the profile configured for `device_id` (or the default profile) is used.
+
     Returns the transcribed text, LLM's text response, and a Base64-encoded audio response.
     """
     if not audio_file.content_type.startswith("audio/"):
@@ -38,10 +50,23 @@ async def process_voice_command_api(audio_file: UploadFile = File(...)):
         )
 
     try:
-        audio_bytes = await audio_file.read()
+        ai_service.resolve_asr_profile(asr_profile, device_id)
+    except UnknownASRProfile as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # 0. Decode: Stream the upload into a 16 kHz float32 buffer, enforcing size/duration limits
+    try:
+        audio = await decode_upload(audio_file)
+    except AudioLimitExceeded as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except UnsupportedAudioFormat as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    except AudioDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Could not decode audio: {str(e)}")
 
+    try:
         # 1. ASR: Transcribe audio to text using the AI service
-        transcribed_text = await ai_service.transcribe_audio(audio_bytes)
+        transcribed_text = await ai_service.transcribe_audio(audio, profile_name=asr_profile, device_id=device_id)
 
         # 2. LLM: Process the transcribed text, get response AND potential task
         llm_response_text, task_to_create = await ai_service.get_llm_response(transcribed_text)
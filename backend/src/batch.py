@@ -0,0 +1,63 @@
+# conci-ai-assistant/backend/src/batch.py
+# Command-line entry point for offline bulk transcription and replay of recorded guest audio.
+#
+# Usage (from the backend/ directory):
+#   python -m src.batch recordings/ results/ --dry-run
+#   python -m src.batch recordings/ results/ --workers 4 --batch-size 16 --profile fast --format arrow
+#
+# Without --dry-run, detected tasks are created on the running API server (--server-url).
+# Re-running with the same output directory resumes from its checkpoint.
+# Load the results with e.g. pandas.read_parquet("results/") or pyarrow.dataset.dataset("results/").
+
+import argparse
+import sys
+
+from .core.config import settings
+from .services.batch_pipeline import BatchPipeline
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-transcribe a directory of recorded guest clips with Whisper and replay them through intent detection.")
+    parser.add_argument("input_dir", help="Directory of recorded clips (WAV or Ogg Opus), searched recursively.")
+    parser.add_argument("output_dir", help="Directory for result part files and the resume checkpoint.")
+    parser.add_argument("--profile", default=settings.ASR_DEFAULT_PROFILE, choices=sorted(settings.ASR_PROFILES),
+                        help="ASR decoding profile.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the available cores).")
+    parser.add_argument("--batch-size", type=int, default=16, help="Clips per batched Whisper/LLM call.")
+    parser.add_argument("--format", dest="output_format", choices=["parquet", "arrow"], default="parquet",
+                        help="Columnar output format.")
+    parser.add_argument("--dry-run", action="store_true", help="Never create dashboard tasks; only record what would be created.")
+    parser.add_argument("--server-url", default="http://localhost:8000",
+                        help="Running API server on which detected tasks are created (ignored with --dry-run).")
+    parser.add_argument("--llm-fallback", action="store_true",
+                        help="Generate Mistral responses for clips no intent rule matches (runs a single worker).")
+    parser.add_argument("--max-duration", type=float, default=600.0, help="Clips longer than this many seconds are recorded as errors.")
+    args = parser.parse_args(argv)
+
+    pipeline = BatchPipeline(
+        input_dir=args.input_dir,
+        output_dir=args.output_dir,
+        profile_name=args.profile,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        output_format=args.output_format,
+        dry_run=args.dry_run,
+        server_url=None if args.dry_run else args.server_url,
+        llm_fallback=args.llm_fallback,
+        max_duration_seconds=args.max_duration,
+    )
+    stats = pipeline.run()
+
+    print()
+    print(f"Clips processed: {stats['clips']} ({stats['errors']} with errors, {stats['failed_batches']} failed batches)")
+    if args.dry_run:
+        print("Tasks created: none (dry run; intended tasks are in the task_* result columns)")
+    else:
+        print(f"Tasks created on {args.server_url}: {stats['tasks_created']} (IDs in {args.output_dir}/_tasks.jsonl)")
+    print(f"Elapsed: {stats['elapsed_seconds']:.1f}s")
+    print(f"Throughput: {stats['clips_per_hour']:.0f} clips/hour, {stats['audio_hours_per_hour']:.2f} audio hours per hour")
+    return 1 if stats["failed_batches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
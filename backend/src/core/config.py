@@ -1,9 +1,61 @@
 # conci-ai-assistant/backend/src/core/config.py
 # This file defines the application settings using Pydantic-settings.
 
+from pydantic import BaseModel, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional, Dict, List
 import os
 
+# Domain vocabulary fed to Whisper as an initial prompt, biasing decoding towards hotel requests.
+HOTEL_ASR_PROMPT = (
+    "Hotel guest request to the concierge: towels, linens, housekeeping, room service, "
+    "maintenance, spa booking, HotSOS, front desk, room number."
+)
+
+class ASRProfile(BaseModel):
+    """
+    A named set of Whisper decoding options, trading latency against accuracy.
+    """
+    language: Optional[str] = "en" # Pin the language; None enables per-clip language detection
+    beam_size: Optional[int] = None # None means greedy decoding
+    best_of: Optional[int] = None # Candidates sampled when falling back to a non-zero temperature
+    temperature_fallback: bool = False # Re-decode at increasing temperatures when a decode looks poor
+    initial_prompt: Optional[str] = HOTEL_ASR_PROMPT
+    condition_on_previous_text: bool = False
+
+    def to_transcribe_kwargs(self) -> dict:
+        """Returns the keyword arguments for `whisper_model.transcribe`."""
+        kwargs = {
+            "language": self.language,
+            "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0) if self.temperature_fallback else 0.0,
+            "initial_prompt": self.initial_prompt,
+            "condition_on_previous_text": self.condition_on_previous_text,
+            "fp16": False, # Models run on CPU
+        }
+        if self.beam_size is not None:
+            kwargs["beam_size"] = self.beam_size
+        if self.best_of is not None:
+            kwargs["best_of"] = self.best_of
+        return kwargs
+
+class StageResources(BaseModel):
+    """
+    CPU resources for one model stage ("asr", "llm" or "tts").
+    """
+    threads: Optional[int] = None # Base thread budget; None means an equal share of the available cores
+    cores: Optional[List[int]] = None # Optional CPU affinity set (Linux only); also caps the thread budget
+    min_threads: int = 1 # Lower bound when rebalancing towards busier stages
+
+# Model stages sharing the CPU (see services/resource_manager.py).
+MODEL_STAGES = ("asr", "llm", "tts")
+
+# Built-in ASR profiles. Profiles from the environment are merged over these by name.
+DEFAULT_ASR_PROFILES: Dict[str, ASRProfile] = {
+    "fast": ASRProfile(language="en", beam_size=None, temperature_fallback=False),
+    "balanced": ASRProfile(language="en", beam_size=3, temperature_fallback=False),
+    "accurate": ASRProfile(language=None, beam_size=5, best_of=5, temperature_fallback=True),
+}
+
 class Settings(BaseSettings):
     """
     Application settings class.
@@ -21,9 +73,58 @@ class Settings(BaseSettings):
     MISTRAL_MODEL_ID: str = "mistral-7b-instruct" # Example: a model name or API endpoint
     COQUI_TTS_MODEL_NAME: str = "tts_models/en/ljspeech/fast_pitch" # Example: a Coqui TTS model identifier
 
+    # ASR Decoding Profiles
+    # Profiles can be overridden or added from the environment as JSON, e.g.
+    # ASR_PROFILES='{"fast": {"language": "en", "beam_size": null}}'
+    # Overrides are merged by name over DEFAULT_ASR_PROFILES, so the other built-in profiles remain.
+    ASR_PROFILES: Dict[str, ASRProfile] = DEFAULT_ASR_PROFILES
+    ASR_DEFAULT_PROFILE: str = "balanced" # Used when neither the request nor the device selects a profile
+    ASR_DEVICE_PROFILES: Dict[str, str] = {} # Maps a room device ID to a profile name, e.g. {"room-305": "fast"}
+
+    # Audio Ingest Settings
+    # Uploads are decoded (WAV PCM, WAV IMA-ADPCM or Ogg Opus) in chunks straight into
+    # a 16 kHz float32 buffer; both limits are enforced while the upload is streamed.
+    MAX_AUDIO_UPLOAD_BYTES: int = 2 * 1024 * 1024 # Reject uploads larger than this (2 MiB)
+    MAX_AUDIO_DURATION_SECONDS: float = 30.0 # Reject clips longer than this
+    AUDIO_READ_CHUNK_BYTES: int = 16 * 1024 # Size of each read from the upload stream
+
+    # CPU Resource Manager Settings
+    # Whisper, Mistral and Coqui share one process. Each stage runs on its own worker thread with
+    # a torch thread budget (and optional core affinity), rebalanced by queue depth, so that
+    # concurrent ASR and LLM work does not oversubscribe the CPU.
+    # STAGE_RESOURCES can be overridden as JSON, e.g. STAGE_RESOURCES='{"llm": {"threads": 6, "cores": [2,3,4,5,6,7]}}';
+    # stages missing from the override keep the default StageResources().
+    RESOURCE_MANAGER_ENABLED: bool = True
+    RESOURCE_TOTAL_THREADS: Optional[int] = None # None uses every core available to the process
+    RESOURCE_INTEROP_THREADS: int = 1 # torch inter-op pool size (set once, before any model is loaded)
+    RESOURCE_BLAS_THREADS: Optional[int] = 1 # Cap for non-torch BLAS pools (needs threadpoolctl); None leaves them alone
+    RESOURCE_REBALANCE: bool = True # Shift threads towards stages with deeper queues
+    STAGE_RESOURCES: Dict[str, StageResources] = {stage: StageResources() for stage in MODEL_STAGES}
+
     # PMS/POS Mock Settings (useful for initial development without real integrations)
     MOCK_PMS_POS_ENABLED: bool = True
 
+    # Validation of environment overrides
+    @field_validator("ASR_PROFILES", mode="after")
+    @classmethod
+    def merge_default_asr_profiles(cls, profiles: Dict[str, ASRProfile]) -> Dict[str, ASRProfile]:
+        return {**DEFAULT_ASR_PROFILES, **profiles}
+
+    @field_validator("STAGE_RESOURCES", mode="after")
+    @classmethod
+    def fill_missing_stage_resources(cls, stages: Dict[str, StageResources]) -> Dict[str, StageResources]:
+        return {**{stage: StageResources() for stage in MODEL_STAGES}, **stages}
+
+    @model_validator(mode="after")
+    def check_asr_profile_references(self):
+        # Fail at startup rather than answering every device request with "Unknown ASR profile".
+        if self.ASR_DEFAULT_PROFILE not in self.ASR_PROFILES:
+            raise ValueError(f"ASR_DEFAULT_PROFILE '{self.ASR_DEFAULT_PROFILE}' is not defined in ASR_PROFILES.")
+        for device_id, profile_name in self.ASR_DEVICE_PROFILES.items():
+            if profile_name not in self.ASR_PROFILES:
+                raise ValueError(f"ASR_DEVICE_PROFILES['{device_id}'] refers to undefined ASR profile '{profile_name}'.")
+        return self
+
     # Configuration for Pydantic-settings to load from .env file
     # It looks for a .env file in the project root (conci-ai-assistant/)
     # 'extra='ignore'' means it won't raise an error if other env vars are present.
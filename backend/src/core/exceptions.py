@@ -0,0 +1,19 @@
+# conci-ai-assistant/backend/src/core/exceptions.py
+# This file defines custom exceptions raised by the services layer.
+# API routes translate these into the appropriate HTTP error responses.
+
+class AudioDecodeError(ValueError):
+    """Raised when an uploaded audio stream is malformed or cannot be decoded."""
+    pass
+
+class UnsupportedAudioFormat(AudioDecodeError):
+    """Raised when an uploaded audio stream uses a container or codec we cannot decode."""
+    pass
+
+class AudioLimitExceeded(AudioDecodeError):
+    """Raised when an uploaded audio stream exceeds the configured size or duration limits."""
+    pass
+
+class UnknownASRProfile(ValueError):
+    """Raised when a request or device selects an ASR profile that is not configured."""
+    pass
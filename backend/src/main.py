@@ -10,12 +10,14 @@ import os
 # --- Local imports ---
 # Import ALL API routers, including the new dashboard router
 from .api.v1 import voice, pms_pos, dashboard # ADDED 'dashboard'
+from .api.middleware import UploadSizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
 
 # Import application settings
 from .core.config import settings
 
 # Import AI service (for loading models at startup)
 from .services.ai_models import ai_service
+from .services.resource_manager import resource_manager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -28,7 +30,8 @@ async def lifespan(app: FastAPI):
     await ai_service.load_models()
     yield  # The application will run until this point
     print(f"{settings.APP_NAME} shutting down...")
-    # Add any cleanup tasks here if necessary
+    # Stop the per-stage model worker threads
+    resource_manager.shutdown()
 
 # Initialize the FastAPI application with settings
 app = FastAPI(
@@ -38,6 +41,15 @@ app = FastAPI(
     lifespan=lifespan # Attach the lifespan context manager
 )
 
+# --- Upload Size Limit ---
+# Reject oversized voice uploads before FastAPI reads and spools the multipart body.
+# Added before CORS so that CORS (the outer middleware) also applies to the 413 responses.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_bytes=settings.MAX_AUDIO_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    paths=["/api/v1/voice_command/"],
+)
+
 # --- CORS Configuration ---
 # Define origins that are allowed to make requests to your FastAPI backend.
 origins = [
@@ -5,19 +5,23 @@
 
 import asyncio
 import base64
-import io
 import numpy as np
 # import soundfile as sf # REMOVED: No longer needed
 import re
+from typing import Optional, Union, Tuple, List
 
 # Import actual AI model libraries
+import torch
 import whisper # ASR
 from transformers import pipeline # LLM (Mistral)
 from TTS.api import TTS # Coqui TTS
 
 # Import settings and new TaskCreateRequest model
-from ..core.config import settings
+from ..core.config import settings, ASRProfile
+from ..core.exceptions import UnknownASRProfile
 from ..core.models import TaskCreateRequest
+from .audio_decoder import decode_audio_bytes
+from .resource_manager import resource_manager
 
 class AIService:
     """
@@ -35,6 +39,8 @@ class AIService:
         """
         Loads the Whisper, Mistral, and Coqui TTS models.
         This is an asynchronous operation and will be called once at application startup.
+        Each model is loaded on its stage's worker thread, so the thread budget and core affinity
+        configured in settings.STAGE_RESOURCES apply from the start.
         """
         if self.models_loaded:
             print("AI models already loaded.")
@@ -43,23 +49,20 @@ class AIService:
         print("Loading AI models for the first time. This may take a while...")
 
         try:
+            # --- Apply process-wide thread limits before any model touches torch ---
+            resource_manager.configure_process()
+
             # --- Load Whisper ASR Model ---
-            print(f"Loading Whisper ASR model ({settings.WHISPER_MODEL_SIZE})...")
-            self.whisper_model = whisper.load_model(settings.WHISPER_MODEL_SIZE, device="cpu")
-            print("Whisper ASR model loaded.")
+            await resource_manager.run("asr", self.load_whisper_model)
 
             # --- Load Mistral LLM Model ---
-            print(f"Loading Mistral LLM ({settings.MISTRAL_MODEL_ID})...")
-            self.mistral_pipeline = pipeline(
-                "text-generation",
-                model=settings.MISTRAL_MODEL_ID,
-                device="cpu"
-            )
-            print("Mistral LLM loaded.")
+            await resource_manager.run("llm", self.load_mistral_pipeline)
 
             # --- Load Coqui TTS Model ---
             print(f"Loading Coqui TTS model ({settings.COQUI_TTS_MODEL_NAME})...")
-            self.coqui_tts_model = TTS(
+            self.coqui_tts_model = await resource_manager.run(
+                "tts",
+                TTS,
                 model_name=settings.COQUI_TTS_MODEL_NAME,
                 progress_bar=False,
                 gpu=False
@@ -73,24 +76,187 @@ class AIService:
             print(f"Error loading AI models: {e}")
             raise
 
-    async def transcribe_audio(self, audio_bytes: bytes) -> str:
+    def load_whisper_model(self):
+        """
+        Loads only the Whisper ASR model.
+        Used by load_models and by tools (e.g. the ASR benchmark) that do not need the LLM or TTS.
+        """
+        if self.whisper_model is not None:
+            return
+        print(f"Loading Whisper ASR model ({settings.WHISPER_MODEL_SIZE})...")
+        self.whisper_model = whisper.load_model(settings.WHISPER_MODEL_SIZE, device="cpu")
+        print("Whisper ASR model loaded.")
+
+    def load_mistral_pipeline(self):
+        """
+        Loads only the Mistral LLM pipeline.
+        Used by load_models and by the offline batch pipeline when LLM fallback is enabled.
+        """
+        if self.mistral_pipeline is not None:
+            return
+        print(f"Loading Mistral LLM ({settings.MISTRAL_MODEL_ID})...")
+        self.mistral_pipeline = pipeline(
+            "text-generation",
+            model=settings.MISTRAL_MODEL_ID,
+            device="cpu"
+        )
+        print("Mistral LLM loaded.")
+
+    def resolve_asr_profile(self, profile_name: Optional[str] = None, device_id: Optional[str] = None) -> Tuple[str, ASRProfile]:
+        """
+        Picks the ASR decoding profile for a request.
+        An explicitly requested profile wins, then the profile configured for the device,
+        then settings.ASR_DEFAULT_PROFILE. Returns (profile_name, profile).
+        Settings validation guarantees the default and per-device profiles exist,
+        so UnknownASRProfile can only come from a name the client sent.
+        """
+        if not profile_name and device_id:
+            profile_name = settings.ASR_DEVICE_PROFILES.get(device_id)
+        profile_name = profile_name or settings.ASR_DEFAULT_PROFILE
+
+        profile = settings.ASR_PROFILES.get(profile_name)
+        if profile is None:
+            raise UnknownASRProfile(
+                f"Unknown ASR profile '{profile_name}'. Available profiles: {', '.join(sorted(settings.ASR_PROFILES))}."
+            )
+        return profile_name, profile
+
+    def transcribe_array(self, audio: np.ndarray, profile: ASRProfile) -> str:
+        """
+        Runs Whisper on a decoded 16 kHz mono float32 array with the given decoding profile.
+        """
+        result = self.whisper_model.transcribe(audio, **profile.to_transcribe_kwargs())
+        return result["text"]
+
+    def transcribe_batch(self, audios: List[np.ndarray], profile: ASRProfile) -> List[str]:
         """
-        Transcribes raw audio bytes into text using the Whisper ASR model.
+        Transcribes several decoded clips with a single batched Whisper decode.
+        Clips longer than Whisper's 30-second window go through transcribe_array instead.
+        If the profile enables temperature fallback, clips whose greedy/beam result looks poor
+        (Whisper's compression-ratio and log-probability thresholds) are re-decoded individually.
+        Clips that look silent get an empty transcript, using the same no-speech rule as
+        `transcribe()` (no_speech_prob > 0.6 and avg_logprob < -1.0), so the batch results match
+        the live /voice_command/ path instead of containing hallucinated text.
+        """
+        texts: List[Optional[str]] = [None] * len(audios)
+        batch_indices = [i for i, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+        for i in set(range(len(audios))) - set(batch_indices):
+            texts[i] = self.transcribe_array(audios[i], profile)
+        if not batch_indices:
+            return texts
+
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audios[i]), self.whisper_model.dims.n_mels)
+            for i in batch_indices
+        ]).to(self.whisper_model.device)
+        options = whisper.DecodingOptions(
+            language=profile.language,
+            beam_size=profile.beam_size,
+            prompt=profile.initial_prompt,
+            temperature=0.0,
+            fp16=False, # Models run on CPU
+        )
+        results = whisper.decode(self.whisper_model, mel, options)
+
+        for i, result in zip(batch_indices, results):
+            no_speech = result.no_speech_prob > 0.6
+            needs_fallback = result.compression_ratio > 2.4 or result.avg_logprob < -1.0
+            if no_speech and result.avg_logprob < -1.0:
+                texts[i] = ""
+            elif profile.temperature_fallback and needs_fallback and not no_speech:
+                texts[i] = self.transcribe_array(audios[i], profile)
+            else:
+                texts[i] = result.text
+        return texts
+
+    async def transcribe_audio(self, audio: Union[bytes, np.ndarray], profile_name: Optional[str] = None, device_id: Optional[str] = None) -> str:
+        """
+        Transcribes audio into text using the Whisper ASR model.
+        Accepts either an already decoded 16 kHz mono float32 array (see audio_decoder)
+        or the raw bytes of an uploaded audio file, which are decoded first.
+        The decoding profile is chosen by name or by device (see resolve_asr_profile).
         """
         if not self.models_loaded:
             await self.load_models()
 
-        print("AIService: Transcribing audio with Whisper...")
+        profile_name, profile = self.resolve_asr_profile(profile_name, device_id)
+        print(f"AIService: Transcribing audio with Whisper (profile: {profile_name})...")
         try:
-            audio_file = io.BytesIO(audio_bytes)
-            result = self.whisper_model.transcribe(audio_file)
-            transcribed_text = result["text"]
+            if isinstance(audio, (bytes, bytearray)):
+                audio = decode_audio_bytes(audio)
+            transcribed_text = await resource_manager.run("asr", self.transcribe_array, audio, profile)
             print(f"Whisper Transcribed: '{transcribed_text}'")
             return transcribed_text
         except Exception as e:
             print(f"Error during Whisper transcription: {e}")
             raise
 
+    def match_intent(self, text_input: str) -> Optional[Tuple[str, Optional[TaskCreateRequest]]]:
+        """
+        Rule-based intent matching for common hotel requests.
+        Returns (response_text, TaskCreateRequest_or_None), or None when no rule matches
+        and the request should go to the Mistral LLM.
+        """
+        text_input_lower = text_input.lower()
+        room_match = re.search(r'(room|rm)\s*(\d+)', text_input_lower)
+        room_number = room_match.group(2) if room_match else None
+
+        if "towel" in text_input_lower or "towels" in text_input_lower or "linens" in text_input_lower:
+            llm_response_text = f"Certainly, I'll send fresh towels to room {room_number if room_number else 'your room'}. Is there anything else?"
+            task_to_create = TaskCreateRequest(
+                guest_request=text_input,
+                room_number=room_number,
+                category="Housekeeping",
+                priority="medium",
+            )
+        elif "fix" in text_input_lower or "broken" in text_input_lower or "maintenance" in text_input_lower:
+            llm_response_text = f"I've noted a maintenance request for room {room_number if room_number else 'your room'}. Could you describe the issue briefly?"
+            task_to_create = TaskCreateRequest(
+                guest_request=text_input,
+                room_number=room_number,
+                category="Maintenance",
+                priority="high" if "urgent" in text_input_lower else "medium",
+            )
+        elif "food" in text_input_lower or "drink" in text_input_lower or "room service" in text_input_lower:
+            llm_response_text = f"Certainly, what would you like to order from room service for room {room_number if room_number else 'your room'}?"
+            task_to_create = TaskCreateRequest(
+                guest_request=text_input,
+                room_number=room_number,
+                category="Room Service",
+                priority="medium",
+            )
+        elif "spa booking" in text_input_lower or "spa appointment" in text_input_lower:
+            llm_response_text = "Certainly, I can help with a spa booking. What service are you interested in and what is your name?"
+            task_to_create = None # Handled by separate endpoint
+        elif "create task" in text_input_lower or "hotsos" in text_input_lower:
+            llm_response_text = "I can create a HotSOS task. Please describe the task."
+            task_to_create = None # Handled by separate endpoint
+        else:
+            return None
+        return llm_response_text, task_to_create
+
+    def generate_llm_responses(self, text_inputs: List[str], batch_size: int = 1) -> List[str]:
+        """
+        Generates free-form Mistral responses for one or more inputs.
+        Inputs are passed to the pipeline as a list, so batch_size > 1 batches the forward passes.
+        """
+        prompts = [f"### Instruction:\n{text_input}\n\n### Response:\n" for text_input in text_inputs]
+        if batch_size > 1 and self.mistral_pipeline.tokenizer.pad_token is None:
+            # Batched generation needs padding; Mistral's tokenizer ships without a pad token.
+            self.mistral_pipeline.tokenizer.pad_token = self.mistral_pipeline.tokenizer.eos_token
+        responses = self.mistral_pipeline(
+            prompts,
+            batch_size=batch_size,
+            max_new_tokens=100,
+            num_return_sequences=1,
+            do_sample=True,
+            temperature=0.7
+        )
+        return [
+            response[0]['generated_text'].replace(prompt, '').strip()
+            for prompt, response in zip(prompts, responses)
+        ]
+
     async def get_llm_response(self, text_input: str) -> tuple[str, Optional[TaskCreateRequest]]:
         """
         Generates a text response using the Mistral 7B LLM.
@@ -105,50 +271,11 @@ class AIService:
         llm_response_text: str = ""
 
         try:
-            text_input_lower = text_input.lower()
-            room_match = re.search(r'(room|rm)\s*(\d+)', text_input_lower)
-            room_number = room_match.group(2) if room_match else None
-
-            if "towel" in text_input_lower or "towels" in text_input_lower or "linens" in text_input_lower:
-                llm_response_text = f"Certainly, I'll send fresh towels to room {room_number if room_number else 'your room'}. Is there anything else?"
-                task_to_create = TaskCreateRequest(
-                    guest_request=text_input,
-                    room_number=room_number,
-                    category="Housekeeping",
-                    priority="medium",
-                )
-            elif "fix" in text_input_lower or "broken" in text_input_lower or "maintenance" in text_input_lower:
-                llm_response_text = f"I've noted a maintenance request for room {room_number if room_number else 'your room'}. Could you describe the issue briefly?"
-                task_to_create = TaskCreateRequest(
-                    guest_request=text_input,
-                    room_number=room_number,
-                    category="Maintenance",
-                    priority="high" if "urgent" in text_input_lower else "medium",
-                )
-            elif "food" in text_input_lower or "drink" in text_input_lower or "room service" in text_input_lower:
-                llm_response_text = f"Certainly, what would you like to order from room service for room {room_number if room_number else 'your room'}?"
-                task_to_create = TaskCreateRequest(
-                    guest_request=text_input,
-                    room_number=room_number,
-                    category="Room Service",
-                    priority="medium",
-                )
-            elif "spa booking" in text_input_lower or "spa appointment" in text_input_lower:
-                llm_response_text = "Certainly, I can help with a spa booking. What service are you interested in and what is your name?"
-                task_to_create = None # Handled by separate endpoint
-            elif "create task" in text_input_lower or "hotsos" in text_input_lower:
-                llm_response_text = "I can create a HotSOS task. Please describe the task."
-                task_to_create = None # Handled by separate endpoint
+            matched = self.match_intent(text_input)
+            if matched is not None:
+                llm_response_text, task_to_create = matched
             else:
-                prompt = f"### Instruction:\n{text_input}\n\n### Response:\n"
-                response = self.mistral_pipeline(
-                    prompt,
-                    max_new_tokens=100,
-                    num_return_sequences=1,
-                    do_sample=True,
-                    temperature=0.7
-                )
-                llm_response_text = response[0]['generated_text'].replace(prompt, '').strip()
+                llm_response_text = (await resource_manager.run("llm", self.generate_llm_responses, [text_input]))[0]
                 print(f"Mistral LLM Response: '{llm_response_text}'")
 
             print(f"LLM determined task_to_create: {task_to_create.dict() if task_to_create else 'None'}")
@@ -168,7 +295,7 @@ class AIService:
 
         print(f"AIService: Synthesizing speech for: '{text_to_speak}' with Coqui TTS...")
         try:
-            audio_numpy_array = self.coqui_tts_model.tts(text=text_to_speak)
+            audio_numpy_array = await resource_manager.run("tts", self.coqui_tts_model.tts, text=text_to_speak)
             # We can't use soundfile here anymore.
             # For a true playable WAV, you'd need to manually construct the WAV header
             # and concatenate it with the raw audio data (from numpy array).
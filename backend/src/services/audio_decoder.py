@@ -0,0 +1,477 @@
+# conci-ai-assistant/backend/src/services/audio_decoder.py
+# This file decodes uploaded audio into the 16 kHz mono float32 array Whisper expects.
+# Supported inputs: WAV (16-bit PCM, 32-bit float, IMA-ADPCM) and Ogg Opus.
+# Decoding is done chunk by chunk in pure Python/numpy (plus libopus via opuslib),
+# without shelling out to ffmpeg, and size/duration limits are enforced chunk by chunk.
+
+import struct
+from typing import List, Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import opuslib # Opus decoding (ctypes binding to libopus)
+except ImportError: # Opus support is optional; WAV/ADPCM uploads work without it
+    opuslib = None
+
+from ..core.config import settings
+from ..core.exceptions import AudioDecodeError, UnsupportedAudioFormat, AudioLimitExceeded
+
+# Whisper operates on 16 kHz mono audio.
+TARGET_SAMPLE_RATE = 16000
+
+# WAV format tags
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_IMA_ADPCM = 0x0011
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# IMA-ADPCM step and index tables
+_IMA_STEP_TABLE = [
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+]
+_IMA_INDEX_TABLE = [-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8]
+
+def _build_ima_tables():
+    """Precomputes the signed difference and next step index for every (index, nibble) pair."""
+    diff_table, next_index_table = [], []
+    for index, step in enumerate(_IMA_STEP_TABLE):
+        diffs, next_indices = [], []
+        for nibble in range(16):
+            diff = step >> 3
+            if nibble & 4:
+                diff += step
+            if nibble & 2:
+                diff += step >> 1
+            if nibble & 1:
+                diff += step >> 2
+            diffs.append(-diff if nibble & 8 else diff)
+            next_indices.append(min(max(index + _IMA_INDEX_TABLE[nibble], 0), 88))
+        diff_table.append(diffs)
+        next_index_table.append(next_indices)
+    return diff_table, next_index_table
+
+_IMA_DIFF_TABLE, _IMA_NEXT_INDEX_TABLE = _build_ima_tables()
+
+# Largest Opus frame (120 ms) at the target sample rate.
+_MAX_OPUS_FRAME_SAMPLES = TARGET_SAMPLE_RATE * 120 // 1000
+
+
+def _decode_ima_adpcm_block(block: bytes, channels: int) -> np.ndarray:
+    """
+    Decodes one IMA-ADPCM WAV block into a mono float32 array.
+    Each channel starts with a 4-byte header (initial predictor and step index),
+    followed by 4-byte words of nibbles interleaved per channel, low nibble first.
+    A truncated final block is decoded as far as its data goes.
+    """
+    header_size = 4 * channels
+    data = block[header_size:]
+    decoded = []
+    for ch in range(channels):
+        predictor, index = struct.unpack_from("<hB", block, 4 * ch)
+        index = min(index, 88)
+        samples = [predictor]
+        for word_start in range(4 * ch, len(data), 4 * channels):
+            for byte in data[word_start:word_start + 4]:
+                for nibble in (byte & 0x0F, byte >> 4):
+                    predictor += _IMA_DIFF_TABLE[index][nibble]
+                    if predictor > 32767:
+                        predictor = 32767
+                    elif predictor < -32768:
+                        predictor = -32768
+                    index = _IMA_NEXT_INDEX_TABLE[index][nibble]
+                    samples.append(predictor)
+        decoded.append(samples)
+
+    length = min(len(samples) for samples in decoded)
+    pcm = np.array([samples[:length] for samples in decoded], dtype=np.float32)
+    return pcm.mean(axis=0) / 32768.0
+
+
+class AudioBuffer:
+    """
+    Preallocated float32 buffer holding the decoded 16 kHz mono audio.
+    Sized for the maximum allowed duration so that appending never reallocates;
+    writing past the end means the clip is too long.
+    """
+    def __init__(self, max_duration_seconds: float):
+        self.max_duration_seconds = max_duration_seconds
+        self._data = np.empty(int(max_duration_seconds * TARGET_SAMPLE_RATE), dtype=np.float32)
+        self.length = 0
+
+    def append(self, samples: np.ndarray) -> None:
+        end = self.length + len(samples)
+        if end > len(self._data):
+            raise AudioLimitExceeded(
+                f"Audio is longer than the maximum allowed duration of {self.max_duration_seconds:g} seconds."
+            )
+        self._data[self.length:end] = samples
+        self.length = end
+
+    def view(self) -> np.ndarray:
+        """Returns the decoded samples (a view, no copy)."""
+        return self._data[:self.length]
+
+
+class _AntiAliasFilter:
+    """
+    Streaming low-pass FIR (Kaiser-windowed sinc) applied before downsampling.
+    Linear interpolation alone would fold content above 8 kHz back into the speech band;
+    this removes it first, like the low-pass in ffmpeg's resampler that Whisper's own loader uses.
+    The last `taps - 1` input samples are carried across chunks, and the filter delay is
+    compensated so the output lines up with the input.
+    """
+    STOPBAND_ATTENUATION_DB = 60.0
+    TRANSITION_HZ = 1600.0 # Centred on the target Nyquist frequency: passes up to 7.2 kHz, stops from 8.8 kHz
+
+    def __init__(self, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE):
+        cutoff = 0.5 * target_rate / source_rate # Normalised to the source rate
+        transition = 2 * np.pi * self.TRANSITION_HZ / source_rate
+        taps = int(np.ceil((self.STOPBAND_ATTENUATION_DB - 8) / (2.285 * transition))) | 1 # Odd, for an integer delay
+        beta = 0.1102 * (self.STOPBAND_ATTENUATION_DB - 8.7)
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(taps, beta)
+        self._kernel = (kernel / kernel.sum()).astype(np.float32)
+        self._delay = (taps - 1) // 2
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        self._to_skip = self._delay
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        padded = np.concatenate([self._history, samples])
+        filtered = np.convolve(padded, self._kernel, mode="valid").astype(np.float32)
+        self._history = padded[len(padded) - len(self._history):]
+        skipped = min(self._to_skip, len(filtered))
+        self._to_skip -= skipped
+        return filtered[skipped:]
+
+    def flush(self) -> np.ndarray:
+        """Drains the samples still held back by the filter delay."""
+        return self.process(np.zeros(self._delay, dtype=np.float32))
+
+
+class _LinearResampler:
+    """
+    Streaming linear-interpolation resampler.
+    Carries the last input sample and the fractional read position across chunks,
+    so chunk boundaries do not introduce discontinuities.
+    When downsampling, the input first goes through an _AntiAliasFilter.
+    """
+    def __init__(self, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE):
+        self.step = source_rate / target_rate
+        self._position = 0.0 # Next output position, relative to the start of the pending input
+        self._previous: Optional[np.ndarray] = None
+        self._filter = _AntiAliasFilter(source_rate, target_rate) if source_rate > target_rate else None
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self._filter is not None:
+            samples = self._filter.process(samples)
+        return self._interpolate(samples)
+
+    def flush(self) -> np.ndarray:
+        """Returns the output still held back by the anti-alias filter at the end of the stream."""
+        if self._filter is None:
+            return np.empty(0, dtype=np.float32)
+        return self._interpolate(self._filter.flush())
+
+    def _interpolate(self, samples: np.ndarray) -> np.ndarray:
+        if self._previous is not None:
+            samples = np.concatenate([self._previous, samples])
+        if len(samples) < 2:
+            self._previous = samples
+            return np.empty(0, dtype=np.float32)
+
+        last = len(samples) - 1
+        count = int(np.floor((last - self._position) / self.step)) + 1 if self._position <= last else 0
+        positions = self._position + self.step * np.arange(count)
+        # Keep the final sample so the next chunk can interpolate across the boundary.
+        positions = positions[positions < last]
+        resampled = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+        self._position += self.step * len(positions) - last
+        self._previous = samples[-1:]
+        return resampled
+
+
+class _WavDecoder:
+    """Incremental RIFF/WAVE decoder for PCM, IEEE float and IMA-ADPCM data."""
+    def __init__(self):
+        self._buffer = bytearray()
+        self._riff_checked = False
+        self._in_data = False
+        self._data_remaining: Optional[int] = None
+        self.sample_rate: Optional[int] = None
+        self._format_tag = None
+        self._channels = 0
+        self._block_align = 0
+        self._bits_per_sample = 0
+
+    def feed(self, data: bytes) -> List[np.ndarray]:
+        self._buffer.extend(data)
+        if not self._in_data and not self._parse_header():
+            return []
+        return self._decode_available(final=False)
+
+    def flush(self) -> List[np.ndarray]:
+        if not self._in_data:
+            raise AudioDecodeError("WAV stream ended before the audio data chunk.")
+        return self._decode_available(final=True)
+
+    def _parse_header(self) -> bool:
+        """Consumes header chunks from the buffer; returns True once the data chunk is reached."""
+        if not self._riff_checked:
+            if len(self._buffer) < 12:
+                return False
+            if self._buffer[0:4] != b"RIFF" or self._buffer[8:12] != b"WAVE":
+                raise AudioDecodeError("Invalid WAV header.")
+            del self._buffer[:12]
+            self._riff_checked = True
+
+        while len(self._buffer) >= 8:
+            chunk_id = bytes(self._buffer[0:4])
+            chunk_size = struct.unpack_from("<I", self._buffer, 4)[0]
+            if chunk_id == b"data":
+                if self.sample_rate is None:
+                    raise AudioDecodeError("WAV data chunk appears before the fmt chunk.")
+                del self._buffer[:8]
+                # Streaming recorders often write 0 or 0xFFFFFFFF as the data size; read to EOF then.
+                self._data_remaining = chunk_size if 0 < chunk_size < 0xFFFFFFFF else None
+                self._in_data = True
+                return True
+
+            padded_size = chunk_size + (chunk_size & 1)
+            if len(self._buffer) < 8 + padded_size:
+                return False
+            if chunk_id == b"fmt ":
+                self._parse_fmt(bytes(self._buffer[8:8 + chunk_size]))
+            del self._buffer[:8 + padded_size]
+        return False
+
+    def _parse_fmt(self, fmt: bytes) -> None:
+        if len(fmt) < 16:
+            raise AudioDecodeError("WAV fmt chunk is too short.")
+        (format_tag, self._channels, self.sample_rate, _byte_rate,
+         self._block_align, self._bits_per_sample) = struct.unpack_from("<HHIIHH", fmt, 0)
+        if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            format_tag = struct.unpack_from("<H", fmt, 24)[0] # First two bytes of the SubFormat GUID
+
+        if self._channels < 1 or self.sample_rate < 1 or self._block_align < 1:
+            raise AudioDecodeError("WAV fmt chunk has invalid channel count, sample rate or block size.")
+        if (format_tag == _WAVE_FORMAT_PCM and self._bits_per_sample == 16) or \
+                (format_tag == _WAVE_FORMAT_IEEE_FLOAT and self._bits_per_sample == 32):
+            if self._block_align != self._channels * self._bits_per_sample // 8:
+                raise AudioDecodeError(
+                    f"WAV block size {self._block_align} does not match {self._channels} channel(s) "
+                    f"of {self._bits_per_sample}-bit samples."
+                )
+        elif format_tag == _WAVE_FORMAT_IMA_ADPCM and self._bits_per_sample == 4:
+            if self._block_align <= 4 * self._channels:
+                raise AudioDecodeError("IMA-ADPCM block size is too small.")
+        else:
+            raise UnsupportedAudioFormat(
+                f"Unsupported WAV encoding (format tag 0x{format_tag:04x}, {self._bits_per_sample} bits per sample)."
+            )
+        self._format_tag = format_tag
+
+    def _decode_available(self, final: bool) -> List[np.ndarray]:
+        available = len(self._buffer)
+        if self._data_remaining is not None:
+            available = min(available, self._data_remaining)
+        usable = available - available % self._block_align
+        if final and self._format_tag == _WAVE_FORMAT_IMA_ADPCM and available - usable > 4 * self._channels:
+            usable = available # A short final ADPCM block is still decodable
+
+        if usable <= 0:
+            return []
+        payload = bytes(self._buffer[:usable])
+        del self._buffer[:usable]
+        if self._data_remaining is not None:
+            self._data_remaining -= usable
+
+        if self._format_tag == _WAVE_FORMAT_IMA_ADPCM:
+            return [
+                _decode_ima_adpcm_block(payload[start:start + self._block_align], self._channels)
+                for start in range(0, len(payload), self._block_align)
+            ]
+
+        if self._format_tag == _WAVE_FORMAT_PCM:
+            samples = np.frombuffer(payload, dtype="<i2").astype(np.float32) / 32768.0
+        else:
+            samples = np.frombuffer(payload, dtype="<f4").astype(np.float32)
+        frames = samples.reshape(-1, self._channels)
+        return [frames.mean(axis=1) if self._channels > 1 else frames[:, 0]]
+
+
+class _OggOpusDecoder:
+    """
+    Incremental Ogg Opus decoder.
+    Reassembles Ogg packets from pages and decodes them with libopus directly at 16 kHz.
+    Only single-stream mono/stereo Opus (channel mapping family 0) is supported.
+    """
+    def __init__(self):
+        if opuslib is None:
+            raise UnsupportedAudioFormat("Opus audio requires the 'opuslib' package (and libopus) to be installed.")
+        self._buffer = bytearray()
+        self._packet = bytearray()
+        self._packet_count = 0
+        self._decoder = None
+        self._channels = 0
+        self._skip_samples = 0
+        self.sample_rate = TARGET_SAMPLE_RATE
+
+    def feed(self, data: bytes) -> List[np.ndarray]:
+        self._buffer.extend(data)
+        decoded = []
+        for packet in self._read_packets():
+            samples = self._handle_packet(packet)
+            if samples is not None and len(samples):
+                decoded.append(samples)
+        return decoded
+
+    def flush(self) -> List[np.ndarray]:
+        if self._decoder is None:
+            raise AudioDecodeError("Ogg stream ended before the OpusHead header.")
+        return []
+
+    def _read_packets(self):
+        while len(self._buffer) >= 27:
+            if self._buffer[0:4] != b"OggS":
+                raise AudioDecodeError("Invalid Ogg page.")
+            segment_count = self._buffer[26]
+            header_size = 27 + segment_count
+            if len(self._buffer) < header_size:
+                return
+            lacing = self._buffer[27:header_size]
+            page_size = header_size + sum(lacing)
+            if len(self._buffer) < page_size:
+                return
+
+            offset = header_size
+            for segment_size in lacing:
+                self._packet.extend(self._buffer[offset:offset + segment_size])
+                offset += segment_size
+                if segment_size < 255: # A lacing value below 255 terminates the packet
+                    yield bytes(self._packet)
+                    self._packet.clear()
+            del self._buffer[:page_size]
+
+    def _handle_packet(self, packet: bytes) -> Optional[np.ndarray]:
+        self._packet_count += 1
+        if self._packet_count == 1:
+            if len(packet) < 19 or packet[0:8] != b"OpusHead":
+                raise UnsupportedAudioFormat("Ogg stream does not contain Opus audio.")
+            self._channels = packet[9]
+            pre_skip = struct.unpack_from("<H", packet, 10)[0]
+            mapping_family = packet[18]
+            if mapping_family != 0 or self._channels not in (1, 2):
+                raise UnsupportedAudioFormat("Only mono or stereo Opus streams are supported.")
+            # Pre-skip is expressed at 48 kHz.
+            self._skip_samples = pre_skip * TARGET_SAMPLE_RATE // 48000
+            self._decoder = opuslib.Decoder(TARGET_SAMPLE_RATE, self._channels)
+            return None
+        if self._packet_count == 2:
+            return None # OpusTags (comment header)
+
+        try:
+            pcm = self._decoder.decode_float(packet, _MAX_OPUS_FRAME_SAMPLES, False)
+        except opuslib.OpusError as e:
+            raise AudioDecodeError(f"Corrupt Opus packet: {e}")
+        samples = np.frombuffer(pcm, dtype=np.float32).reshape(-1, self._channels).mean(axis=1)
+        if self._skip_samples:
+            skipped = min(self._skip_samples, len(samples))
+            samples = samples[skipped:]
+            self._skip_samples -= skipped
+        return samples
+
+
+class StreamingAudioDecoder:
+    """
+    Push-based decoder that turns an uploaded audio byte stream into 16 kHz mono float32 samples.
+    The container is detected from the first bytes; decoded chunks are resampled if needed
+    and written into a preallocated AudioBuffer. Size and duration limits are checked on every chunk.
+    """
+    def __init__(self, max_bytes: Optional[int] = None, max_duration_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.MAX_AUDIO_UPLOAD_BYTES
+        self.bytes_received = 0
+        self._pending = bytearray()
+        self._decoder = None
+        self._resampler: Optional[_LinearResampler] = None
+        self._output = AudioBuffer(
+            max_duration_seconds if max_duration_seconds is not None else settings.MAX_AUDIO_DURATION_SECONDS
+        )
+
+    def feed(self, data: bytes) -> None:
+        """Decodes the next chunk of the upload."""
+        self.bytes_received += len(data)
+        if self.bytes_received > self.max_bytes:
+            raise AudioLimitExceeded(f"Audio upload is larger than the maximum allowed size of {self.max_bytes} bytes.")
+
+        if self._decoder is None:
+            self._pending.extend(data)
+            if len(self._pending) < 4:
+                return
+            self._decoder = self._detect_decoder(bytes(self._pending[:4]))
+            data = bytes(self._pending)
+            self._pending.clear()
+        self._write(self._decoder.feed(data))
+
+    def finish(self) -> np.ndarray:
+        """Flushes the decoder and returns the decoded 16 kHz mono float32 audio."""
+        if self._decoder is None:
+            raise AudioDecodeError("Audio upload is empty or too short to decode.")
+        self._write(self._decoder.flush())
+        if self._resampler is not None:
+            self._output.append(self._resampler.flush())
+        if self._output.length == 0:
+            raise AudioDecodeError("Audio upload contains no samples.")
+        return self._output.view()
+
+    @staticmethod
+    def _detect_decoder(magic: bytes):
+        if magic == b"RIFF":
+            return _WavDecoder()
+        if magic == b"OggS":
+            return _OggOpusDecoder()
+        raise UnsupportedAudioFormat("Unsupported audio container. Please upload WAV (PCM or IMA-ADPCM) or Ogg Opus audio.")
+
+    def _write(self, chunks: List[np.ndarray]) -> None:
+        for samples in chunks:
+            if self._resampler is None and self._decoder.sample_rate != TARGET_SAMPLE_RATE:
+                self._resampler = _LinearResampler(self._decoder.sample_rate)
+            if self._resampler is not None:
+                samples = self._resampler.process(samples)
+            self._output.append(samples)
+
+
+async def decode_upload(upload_file, chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Feeds an uploaded file (FastAPI `UploadFile`) through the decoder chunk by chunk.
+    By the time the route runs, Starlette has already spooled the request body, so the
+    request-size limit itself is enforced earlier by UploadSizeLimitMiddleware; here the
+    decoded size and duration are checked per chunk, and decoding stops at the first violation.
+    Decoding is CPU-bound (pure-Python ADPCM/Ogg parsing), so it runs in the threadpool
+    instead of blocking the event loop.
+    """
+    chunk_size = chunk_size or settings.AUDIO_READ_CHUNK_BYTES
+    decoder = StreamingAudioDecoder()
+    while True:
+        chunk = await upload_file.read(chunk_size)
+        if not chunk:
+            break
+        await run_in_threadpool(decoder.feed, chunk)
+    return await run_in_threadpool(decoder.finish)
+
+
+def decode_audio_bytes(audio_bytes: bytes, chunk_size: Optional[int] = None) -> np.ndarray:
+    """Decodes an in-memory audio file into 16 kHz mono float32 samples."""
+    chunk_size = chunk_size or settings.AUDIO_READ_CHUNK_BYTES
+    decoder = StreamingAudioDecoder()
+    for start in range(0, len(audio_bytes), chunk_size):
+        decoder.feed(audio_bytes[start:start + chunk_size])
+    return decoder.finish()
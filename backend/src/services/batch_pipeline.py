@@ -0,0 +1,408 @@
+# conci-ai-assistant/backend/src/services/batch_pipeline.py
+# Offline bulk transcription and replay of recorded guest audio (see src/batch.py for the CLI).
+# Clips are streamed from a directory in batches through a process pool; each worker runs a batched
+# Whisper decode followed by intent matching (and, optionally, batched Mistral generation).
+# Results are written as columnar part files (Parquet or Arrow IPC) with a checkpoint for resuming.
+# Detected tasks are only recorded in the results unless a server URL is given, in which case they are
+# created on the running API (POST /api/v1/tasks/) after their batch has been checkpointed.
+
+import json
+import multiprocessing
+import os
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, Optional, Set
+
+try:
+    import pyarrow as pa # Columnar output
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError: # Optional; only needed by the batch pipeline
+    pa = None
+
+from ..core.config import settings
+from ..core.models import TaskCreateRequest
+from .audio_decoder import StreamingAudioDecoder, TARGET_SAMPLE_RATE
+from .resource_manager import available_cpu_count
+
+AUDIO_EXTENSIONS = (".wav", ".ogg", ".opus")
+PART_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+CHECKPOINT_FILENAME = "_checkpoint.jsonl"
+TASKS_FILENAME = "_tasks.jsonl"
+
+RESULT_COLUMNS = [
+    ("clip", "string"), # Path relative to the input directory
+    ("duration_seconds", "float64"),
+    ("asr_profile", "string"),
+    ("transcript", "string"),
+    ("response_text", "string"),
+    ("response_source", "string"), # "rules", "llm", or null when no response was produced
+    ("task_category", "string"),
+    ("task_room_number", "string"),
+    ("task_priority", "string"), # task_* columns describe the intended task; created task IDs are in _tasks.jsonl
+    ("error", "string"),
+]
+
+
+def iter_clips(input_dir: str, skip: Set[str]) -> Iterator[str]:
+    """Walks input_dir lazily (sorted per directory) and yields clip paths relative to it."""
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            clip = os.path.relpath(os.path.join(root, name), input_dir)
+            if clip not in skip:
+                yield clip
+
+
+def iter_batches(clips: Iterator[str], batch_size: int) -> Iterator[List[str]]:
+    batch = []
+    for clip in clips:
+        batch.append(clip)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load_jsonl(path: str) -> List[Dict]:
+    """
+    Reads an append-only JSON-lines record (checkpoint or created tasks).
+    A crash during an append can leave the last line truncated: that line is dropped and cut
+    from the file, so the next append starts on a fresh line. A malformed line followed by
+    further records is real corruption and raises ValueError.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        data = f.read()
+
+    entries = []
+    lines = data.split(b"\n")
+    offset = 0
+    for index, line in enumerate(lines):
+        if line.strip():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                if any(later.strip() for later in lines[index + 1:]):
+                    raise ValueError(f"'{path}' is corrupt at line {index + 1}.")
+                print(f"BatchPipeline: Dropping the truncated last line of '{path}' (interrupted write).")
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+                return entries
+        offset += len(line) + 1
+
+    if data and not data.endswith(b"\n"): # Complete record whose newline was never written
+        with open(path, "ab") as f:
+            f.write(b"\n")
+    return entries
+
+
+class Checkpoint:
+    """
+    Append-only record of completed batches, stored next to the result part files.
+    A part file counts as written only once its checkpoint line exists; on resume,
+    part files without a checkpoint line (from an interrupted run) are removed.
+    """
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, CHECKPOINT_FILENAME)
+        self.exists = os.path.exists(self.path)
+        self.completed_clips: Set[str] = set()
+        self.parts: Set[str] = set()
+        for entry in _load_jsonl(self.path):
+            self.parts.add(entry["part"])
+            self.completed_clips.update(entry["clips"])
+
+    def record(self, part: str, clips: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"part": part, "clips": clips}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.parts.add(part)
+        self.completed_clips.update(clips)
+
+
+class ResultWriter:
+    """
+    Writes each completed batch as its own Parquet/Arrow part file (together they form one dataset).
+    Part files are only cleaned up in a directory that has a checkpoint; a directory holding
+    part files but no checkpoint (e.g. an unrelated dataset) is refused rather than overwritten.
+    """
+    def __init__(self, output_dir: str, output_format: str, checkpoint: Checkpoint):
+        if pa is None:
+            raise RuntimeError("The batch pipeline requires the 'pyarrow' package for Parquet/Arrow output.")
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.extension = PART_EXTENSIONS[output_format]
+        self.schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in RESULT_COLUMNS])
+
+        existing = [name for name in os.listdir(output_dir) if name.startswith("part-")]
+        if existing and not checkpoint.exists:
+            raise RuntimeError(
+                f"Output directory '{output_dir}' already contains part files but no {CHECKPOINT_FILENAME}; "
+                "it does not look like an interrupted batch run. Choose an empty output directory."
+            )
+        for name in existing:
+            if name not in checkpoint.parts: # Temporary, or written by an interrupted run but never checkpointed
+                os.remove(os.path.join(output_dir, name))
+        indices = [int(os.path.splitext(name)[0][5:]) for name in checkpoint.parts]
+        self._next_index = max(indices, default=0) + 1
+
+        other_formats = sorted({os.path.splitext(name)[1] for name in checkpoint.parts} - {self.extension})
+        if other_formats:
+            print(f"BatchPipeline: Warning - resuming with {output_format} output, but earlier parts are "
+                  f"{', '.join(other_formats)}; read the parts of each format separately.")
+
+    def write(self, rows: List[Dict]) -> str:
+        """Writes rows atomically (temporary file + rename) and returns the part file name."""
+        part = f"part-{self._next_index:05d}{self.extension}"
+        self._next_index += 1
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        final_path = os.path.join(self.output_dir, part)
+        temp_path = final_path + ".tmp"
+        if self.output_format == "parquet":
+            pq.write_table(table, temp_path)
+        else:
+            feather.write_feather(table, temp_path)
+        os.replace(temp_path, final_path)
+        return part
+
+    def read(self, part: str) -> List[Dict]:
+        """Reads a part file back; the reader follows the part's extension, not the current format."""
+        path = os.path.join(self.output_dir, part)
+        table = pq.read_table(path) if part.endswith(PART_EXTENSIONS["parquet"]) else feather.read_table(path)
+        return table.to_pylist()
+
+
+class TaskReplayer:
+    """
+    Creates the tasks detected in checkpointed batches on the running API server.
+    Tasks are created only after their batch is checkpointed, and every created task is recorded
+    in _tasks.jsonl (clip -> task ID), so a resumed run neither skips nor repeats tasks;
+    the only window for a duplicate is a crash between the server's reply and the record write.
+    """
+    def __init__(self, output_dir: str, server_url: str, timeout_seconds: float = 10.0):
+        self.path = os.path.join(output_dir, TASKS_FILENAME)
+        self.tasks_url = server_url.rstrip("/") + "/api/v1/tasks/"
+        self.timeout_seconds = timeout_seconds
+        self.created: Dict[str, str] = {entry["clip"]: entry["task_id"] for entry in _load_jsonl(self.path)}
+
+    def replay(self, rows: List[Dict]) -> int:
+        """Creates the not-yet-created tasks for these rows; returns how many were created."""
+        created = 0
+        for row in rows:
+            if row["task_category"] is None or row["clip"] in self.created:
+                continue
+            task_id = self._post_task(TaskCreateRequest(
+                guest_request=row["transcript"],
+                room_number=row["task_room_number"],
+                category=row["task_category"],
+                priority=row["task_priority"],
+            ))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"clip": row["clip"], "task_id": task_id}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.created[row["clip"]] = task_id
+            created += 1
+        return created
+
+    def _post_task(self, task: TaskCreateRequest) -> str:
+        request = urllib.request.Request(
+            self.tasks_url,
+            data=json.dumps(task.dict()).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+            return json.loads(response.read())["id"]
+
+
+# --- Worker process side ---
+# Each worker process holds its own AIService; workers never create tasks.
+
+_worker_state: Dict = {}
+
+
+def _init_worker(input_dir: str, profile_name: str, threads: int, llm_fallback: bool, llm_batch_size: int,
+                 max_duration_seconds: float):
+    import torch
+    from .ai_models import AIService
+
+    torch.set_num_threads(threads)
+    service = AIService()
+    service.load_whisper_model()
+    if llm_fallback:
+        service.load_mistral_pipeline()
+    _, profile = service.resolve_asr_profile(profile_name)
+    _worker_state.update(
+        service=service, input_dir=input_dir, profile_name=profile_name, profile=profile,
+        llm_fallback=llm_fallback, llm_batch_size=llm_batch_size, max_duration_seconds=max_duration_seconds,
+    )
+
+
+def _decode_clip(path: str, max_duration_seconds: float):
+    decoder = StreamingAudioDecoder(max_bytes=os.path.getsize(path), max_duration_seconds=max_duration_seconds)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(settings.AUDIO_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            decoder.feed(chunk)
+    return decoder.finish().copy() # Release the buffer preallocated for max_duration_seconds
+
+
+def _process_batch(clips: List[str]) -> List[Dict]:
+    """Decodes, transcribes (one batched Whisper decode) and interprets a batch of clips."""
+    service = _worker_state["service"]
+    rows = [dict.fromkeys(name for name, _ in RESULT_COLUMNS) for _ in clips]
+    audios = {}
+    for i, clip in enumerate(clips):
+        rows[i].update(clip=clip, asr_profile=_worker_state["profile_name"])
+        try:
+            audios[i] = _decode_clip(os.path.join(_worker_state["input_dir"], clip), _worker_state["max_duration_seconds"])
+            rows[i]["duration_seconds"] = len(audios[i]) / TARGET_SAMPLE_RATE
+        except Exception as e: # A bad clip must not fail the whole batch
+            rows[i]["error"] = f"decode: {e}"
+
+    decoded = list(audios)
+    transcripts = service.transcribe_batch([audios[i] for i in decoded], _worker_state["profile"])
+
+    needs_llm = []
+    for i, transcript in zip(decoded, transcripts):
+        transcript = transcript.strip()
+        rows[i]["transcript"] = transcript
+        if not transcript:
+            continue
+        matched = service.match_intent(transcript)
+        if matched is None:
+            needs_llm.append(i)
+            continue
+        rows[i]["response_text"], task = matched
+        rows[i]["response_source"] = "rules"
+        if task is not None:
+            rows[i].update(task_category=task.category, task_room_number=task.room_number, task_priority=task.priority)
+
+    if needs_llm and _worker_state["llm_fallback"]:
+        responses = service.generate_llm_responses(
+            [rows[i]["transcript"] for i in needs_llm], batch_size=_worker_state["llm_batch_size"]
+        )
+        for i, response in zip(needs_llm, responses):
+            rows[i].update(response_text=response, response_source="llm")
+    return rows
+
+
+# --- Parent process side ---
+
+class BatchPipeline:
+    """
+    Streams a directory of recorded clips through a pool of worker processes.
+    Workers get an equal share of the cores (torch threads) and process one batch at a time;
+    a bounded number of batches is kept in flight so the directory is never listed up front.
+    With llm_fallback every worker would hold its own Mistral 7B, so a single worker is used.
+    In dry-run mode detected tasks are only recorded in the results; otherwise they are created
+    on the API server at server_url once their batch is checkpointed (see TaskReplayer).
+    """
+    def __init__(
+        self,
+        input_dir: str,
+        output_dir: str,
+        profile_name: Optional[str] = None,
+        workers: Optional[int] = None,
+        batch_size: int = 16,
+        output_format: str = "parquet",
+        dry_run: bool = False,
+        server_url: Optional[str] = None,
+        llm_fallback: bool = False,
+        max_duration_seconds: float = 600.0,
+    ):
+        if not dry_run and not server_url:
+            raise ValueError("A server URL is required to create tasks; use dry_run to only record them.")
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.profile_name = profile_name or settings.ASR_DEFAULT_PROFILE
+        cores = available_cpu_count()
+        self.workers = workers or max(1, cores // 2)
+        if llm_fallback and self.workers > 1:
+            print(f"BatchPipeline: LLM fallback loads Mistral 7B per worker; using 1 worker instead of {self.workers}.")
+            self.workers = 1
+        self.threads_per_worker = max(1, cores // self.workers)
+        self.batch_size = batch_size
+        self.output_format = output_format
+        self.dry_run = dry_run
+        self.server_url = server_url
+        self.llm_fallback = llm_fallback
+        self.max_duration_seconds = max_duration_seconds
+
+    def run(self) -> Dict:
+        os.makedirs(self.output_dir, exist_ok=True)
+        checkpoint = Checkpoint(self.output_dir)
+        writer = ResultWriter(self.output_dir, self.output_format, checkpoint)
+        replayer = None if self.dry_run else TaskReplayer(self.output_dir, self.server_url)
+        if checkpoint.completed_clips:
+            print(f"BatchPipeline: Resuming; {len(checkpoint.completed_clips)} clips already done.")
+        print(f"BatchPipeline: {self.workers} workers x {self.threads_per_worker} threads, "
+              f"batch size {self.batch_size}, profile '{self.profile_name}', dry run: {self.dry_run}.")
+
+        stats = {"clips": 0, "errors": 0, "failed_batches": 0, "tasks_created": 0, "audio_seconds": 0.0}
+        if replayer is not None:
+            # Batches checkpointed by an interrupted run may still have tasks to create.
+            for part in sorted(checkpoint.parts):
+                stats["tasks_created"] += replayer.replay(writer.read(part))
+        batches = iter_batches(iter_clips(self.input_dir, checkpoint.completed_clips), self.batch_size)
+        max_in_flight = self.workers * 2
+        start = time.perf_counter()
+
+        with self._make_pool() as pool:
+            pending = {}
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_in_flight:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                    else:
+                        pending[pool.submit(_process_batch, batch)] = batch
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    try:
+                        rows = future.result()
+                    except Exception as e: # Left out of the checkpoint, so a resumed run retries it
+                        print(f"BatchPipeline: Batch starting at '{batch[0]}' failed: {e}")
+                        stats["failed_batches"] += 1
+                        continue
+                    part = writer.write(rows)
+                    checkpoint.record(part, batch)
+                    if replayer is not None:
+                        stats["tasks_created"] += replayer.replay(rows)
+
+                    stats["clips"] += len(rows)
+                    stats["errors"] += sum(1 for row in rows if row["error"])
+                    stats["audio_seconds"] += sum(row["duration_seconds"] or 0.0 for row in rows)
+                    elapsed = time.perf_counter() - start
+                    print(f"BatchPipeline: {part} written; {stats['clips']} clips, "
+                          f"{stats['clips'] / elapsed * 3600:.0f} clips/hour.")
+
+        elapsed = time.perf_counter() - start
+        stats["elapsed_seconds"] = elapsed
+        stats["clips_per_hour"] = stats["clips"] / elapsed * 3600 if elapsed else 0.0
+        stats["audio_hours_per_hour"] = stats["audio_seconds"] / elapsed if elapsed else 0.0
+        return stats
+
+    def _make_pool(self):
+        # Spawned (not forked) workers: torch thread pools do not survive fork reliably.
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.input_dir, self.profile_name, self.threads_per_worker, self.llm_fallback,
+                      self.batch_size, self.max_duration_seconds),
+        )
@@ -0,0 +1,190 @@
+# conci-ai-assistant/backend/src/services/resource_manager.py
+# This file partitions the CPU between the co-located model stages (Whisper ASR, Mistral LLM, Coqui TTS).
+# Each stage gets a dedicated worker thread with an optional core-affinity set and a torch thread budget.
+# Budgets are rebalanced towards stages with deeper queues before every call, and never
+# hand out threads that calls still running on other stages hold.
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+try:
+    from threadpoolctl import threadpool_limits # Caps BLAS/OpenMP pools outside torch
+except ImportError: # Optional; torch's own pools are still managed without it
+    threadpool_limits = None
+
+from ..core.config import settings, StageResources
+
+
+def available_cpu_count() -> int:
+    """Returns the number of cores this process may run on (respects an inherited affinity mask)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class ResourceManager:
+    """
+    Gives each model stage a thread budget and an optional core-affinity set.
+    Work for a stage is submitted with `run(stage, func, ...)`, which executes it on that
+    stage's single worker thread; the per-stage queue depth drives rebalancing.
+    When disabled, `run` simply calls the function inline (the original behaviour).
+    Threads granted to running calls are tracked, so the budgets of concurrent calls add up
+    to at most `total_threads` (unless `min_threads` forces more).
+    Core-affinity sets are enforced by the OS; thread budgets are best-effort while stages
+    overlap (see _run_with_budget).
+    """
+    def __init__(
+        self,
+        stage_resources: Optional[Dict[str, StageResources]] = None,
+        total_threads: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        rebalance: Optional[bool] = None,
+        interop_threads: Optional[int] = None,
+        blas_threads: Optional[int] = None,
+    ):
+        self.stage_resources = stage_resources if stage_resources is not None else settings.STAGE_RESOURCES
+        self.total_threads = total_threads or settings.RESOURCE_TOTAL_THREADS or available_cpu_count()
+        self.enabled = settings.RESOURCE_MANAGER_ENABLED if enabled is None else enabled
+        self.rebalance = settings.RESOURCE_REBALANCE if rebalance is None else rebalance
+        self.interop_threads = interop_threads if interop_threads is not None else settings.RESOURCE_INTEROP_THREADS
+        self.blas_threads = blas_threads if blas_threads is not None else settings.RESOURCE_BLAS_THREADS
+
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._queue_depths: Dict[str, int] = {stage: 0 for stage in self.stage_resources}
+        self._granted: Dict[str, int] = {stage: 0 for stage in self.stage_resources} # Threads held by running calls
+        self._lock = threading.RLock()
+        self._process_configured = False
+
+    def configure_process(self):
+        """
+        Applies process-wide limits. Must run before any model is loaded, because torch only
+        accepts an inter-op pool size before its first parallel operation.
+        """
+        if not self.enabled or self._process_configured:
+            return
+        self._process_configured = True
+        print(f"ResourceManager: {self.total_threads} threads across stages {self.base_budgets()}.")
+
+        if self.blas_threads is not None and threadpool_limits is not None:
+            threadpool_limits(limits=self.blas_threads, user_api="blas")
+
+        import torch
+        try:
+            torch.set_num_interop_threads(self.interop_threads)
+        except RuntimeError as e: # Already set, or parallel work has started
+            print(f"ResourceManager: Warning - could not set torch inter-op threads: {e}")
+
+    def base_budgets(self) -> Dict[str, int]:
+        """Configured thread budget per stage; unset budgets get an equal share of the cores."""
+        equal_share = max(1, self.total_threads // max(1, len(self.stage_resources)))
+        return {
+            stage: self._cap(stage, resources.threads or equal_share)
+            for stage, resources in self.stage_resources.items()
+        }
+
+    def budget_for(self, stage: str) -> int:
+        """
+        Current thread budget for a stage.
+        With rebalancing, the cores are split between the stages that have queued or running work,
+        in proportion to base budget x queue depth; a stage running alone gets every core it may use.
+        Either way the budget is limited to the threads not held by calls running on other stages,
+        but never drops below the stage's `min_threads`.
+        """
+        base = self.base_budgets()
+        with self._lock:
+            depths = {s: d for s, d in self._queue_depths.items() if d > 0}
+            held = sum(threads for s, threads in self._granted.items() if s != stage)
+
+        if self.rebalance:
+            depths[stage] = max(depths.get(stage, 0), 1)
+            weights = {s: base[s] * d for s, d in depths.items()}
+            budget = int(round(self.total_threads * weights[stage] / sum(weights.values())))
+        else:
+            budget = base[stage]
+        budget = min(budget, self.total_threads - held)
+        return self._cap(stage, max(self.stage_resources[stage].min_threads, budget))
+
+    def granted_threads(self) -> Dict[str, int]:
+        """Threads held by the call currently running on each stage (0 when idle)."""
+        with self._lock:
+            return dict(self._granted)
+
+    def queue_depths(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._queue_depths)
+
+    async def run(self, stage: str, func, *args, **kwargs):
+        """Runs a blocking model call on the stage's worker thread under its current thread budget."""
+        if not self.enabled:
+            return func(*args, **kwargs)
+        if stage not in self.stage_resources:
+            raise KeyError(f"Unknown model stage '{stage}'. Configured stages: {', '.join(self.stage_resources)}.")
+
+        with self._lock:
+            self._queue_depths[stage] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(self._run_with_budget, stage, func, args, kwargs)
+            return await loop.run_in_executor(self._executor(stage), call)
+        finally:
+            with self._lock:
+                self._queue_depths[stage] -= 1
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+        self._executors.clear()
+
+    def _cap(self, stage: str, threads: int) -> int:
+        cores = self.stage_resources[stage].cores
+        limit = len(cores) if cores else self.total_threads
+        return max(1, min(threads, limit))
+
+    def _executor(self, stage: str) -> ThreadPoolExecutor:
+        with self._lock:
+            if stage not in self._executors:
+                self._executors[stage] = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix=f"conci-{stage}",
+                    initializer=self._init_worker,
+                    initargs=(stage,),
+                )
+            return self._executors[stage]
+
+    def _init_worker(self, stage: str):
+        """Pins the stage's worker thread; the torch/OpenMP threads it spawns inherit the affinity."""
+        cores: Optional[List[int]] = self.stage_resources[stage].cores
+        if cores and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, cores) # 0 = the calling thread
+            except OSError as e:
+                print(f"ResourceManager: Warning - could not pin stage '{stage}' to cores {cores}: {e}")
+
+    def _run_with_budget(self, stage: str, func, args, kwargs):
+        """
+        Grants the stage its budget, runs the call, then releases the threads.
+        The budget is computed and recorded under the lock, so a call starting while another
+        stage is running only gets the threads that are still free.
+        The budget is only approximate while stages overlap: besides the calling thread's
+        OpenMP thread count, torch.set_num_threads also changes process-wide state (the default
+        for new threads, MKL's thread count and the shared pthreadpool), so a stage starting
+        later can change the pool size an already running stage uses. The budget is therefore
+        re-applied on every call rather than cached per worker thread.
+        """
+        import torch
+        with self._lock:
+            threads = self.budget_for(stage)
+            self._granted[stage] = threads
+        try:
+            torch.set_num_threads(threads)
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._granted[stage] = 0
+
+# Instantiate the Resource Manager. This instance is shared by the AI service.
+resource_manager = ResourceManager()
@@ -0,0 +1,47 @@
+# conci-ai-assistant/backend/tests/test_api.py
+# API tests for the FastAPI application. They need the full model stack importable
+# (the AI models themselves are never loaded: the app lifespan is not run).
+
+import io
+import wave
+
+import pytest
+
+pytest.importorskip("whisper")
+pytest.importorskip("transformers")
+pytest.importorskip("TTS")
+
+from fastapi.testclient import TestClient
+
+from src.core.config import settings
+from src.main import app
+
+client = TestClient(app) # Not used as a context manager, so models are not loaded at startup
+
+
+def test_voice_command_rejects_oversized_upload():
+    payload = b"RIFF" + b"\x00" * (settings.MAX_AUDIO_UPLOAD_BYTES + 128 * 1024)
+    response = client.post("/api/v1/voice_command/", files={"audio_file": ("a.wav", payload, "audio/wav")})
+    assert response.status_code == 413
+
+
+def test_voice_command_rejects_overlong_audio():
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\x00\x00" * int(8000 * (settings.MAX_AUDIO_DURATION_SECONDS + 1)))
+    response = client.post("/api/v1/voice_command/", files={"audio_file": ("a.wav", buffer.getvalue(), "audio/wav")})
+    assert response.status_code == 413
+
+
+def test_voice_command_rejects_unsupported_container():
+    payload = b"\x1aE\xdf\xa3" + b"\x00" * 64
+    response = client.post("/api/v1/voice_command/", files={"audio_file": ("a.webm", payload, "audio/webm")})
+    assert response.status_code == 415
+
+
+def test_voice_command_rejects_corrupt_wav():
+    response = client.post("/api/v1/voice_command/", files={"audio_file": ("a.wav", b"RIFF\x00\x00\x00\x00JUNK", "audio/wav")})
+    assert response.status_code == 400
@@ -0,0 +1,202 @@
+# conci-ai-assistant/backend/tests/test_audio_decoder.py
+# Unit tests for the streaming audio decoder (WAV PCM/float/IMA-ADPCM, resampling, limits).
+
+import asyncio
+import io
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from src.core.exceptions import AudioDecodeError, UnsupportedAudioFormat, AudioLimitExceeded
+from src.services import audio_decoder
+from src.services.audio_decoder import StreamingAudioDecoder, decode_audio_bytes, decode_upload, _LinearResampler
+
+
+def make_pcm_wav(samples: np.ndarray, sample_rate: int = 16000) -> bytes:
+    """Builds a 16-bit PCM WAV; samples is (frames,) or (frames, channels) in [-1, 1]."""
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def make_wav(fmt: bytes, data: bytes) -> bytes:
+    return (b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE"
+            + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+            + b"data" + struct.pack("<I", len(data)) + data)
+
+
+def encode_ima_adpcm(samples: np.ndarray, block_align: int = 256):
+    """Mono IMA-ADPCM encoder; returns (WAV bytes, the predictor values a decoder must reproduce)."""
+    samples_per_block = (block_align - 4) * 2 + 1
+    data, expected = b"", []
+    index = 0
+    for start in range(0, len(samples), samples_per_block):
+        block = samples[start:start + samples_per_block]
+        predictor = int(block[0])
+        header = struct.pack("<hBB", predictor, index, 0)
+        expected.append(predictor)
+        nibbles = []
+        for value in block[1:]:
+            step = audio_decoder._IMA_STEP_TABLE[index]
+            diff = int(value) - predictor
+            nibble = 8 if diff < 0 else 0
+            diff = abs(diff)
+            if diff >= step:
+                nibble |= 4
+                diff -= step
+            if diff >= step >> 1:
+                nibble |= 2
+                diff -= step >> 1
+            if diff >= step >> 2:
+                nibble |= 1
+            predictor = max(-32768, min(32767, predictor + audio_decoder._IMA_DIFF_TABLE[index][nibble]))
+            index = audio_decoder._IMA_NEXT_INDEX_TABLE[index][nibble]
+            nibbles.append(nibble)
+            expected.append(predictor)
+        if len(nibbles) % 2:
+            nibbles.append(0)
+            expected.append(None) # Padding nibble in a short final block; decoded but not compared
+        data += header + bytes(nibbles[i] | (nibbles[i + 1] << 4) for i in range(0, len(nibbles), 2))
+        data += b"\x00" * (block_align - 4 - len(nibbles) // 2) if start + samples_per_block < len(samples) else b""
+
+    fmt = struct.pack("<HHIIHHHH", 0x0011, 1, 16000, 16000 * block_align // samples_per_block,
+                      block_align, 4, 2, samples_per_block)
+    return make_wav(fmt, data), expected
+
+
+def decode_in_chunks(data: bytes, chunk_size: int, **limits) -> np.ndarray:
+    decoder = StreamingAudioDecoder(**limits)
+    for start in range(0, len(data), chunk_size):
+        decoder.feed(data[start:start + chunk_size])
+    return decoder.finish()
+
+
+def sine(frequency: float, seconds: float, sample_rate: int, amplitude: float = 0.5) -> np.ndarray:
+    return amplitude * np.sin(2 * np.pi * frequency * np.arange(int(seconds * sample_rate)) / sample_rate)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 1 << 20])
+def test_pcm_wav_round_trip_in_odd_chunks(chunk_size):
+    signal = sine(440, 0.5, 16000)
+    decoded = decode_in_chunks(make_pcm_wav(signal), chunk_size)
+    assert decoded.dtype == np.float32
+    assert len(decoded) == len(signal)
+    np.testing.assert_allclose(decoded, signal, atol=1e-4)
+
+
+def test_stereo_wav_is_downmixed_to_mono():
+    left, right = sine(440, 0.25, 16000, 0.4), sine(440, 0.25, 16000, 0.2)
+    decoded = decode_in_chunks(make_pcm_wav(np.stack([left, right], axis=1)), 333)
+    np.testing.assert_allclose(decoded, (left + right) / 2, atol=1e-4)
+
+
+def test_float_wav():
+    signal = sine(300, 0.25, 16000).astype("<f4")
+    fmt = struct.pack("<HHIIHH", 0x0003, 1, 16000, 16000 * 4, 4, 32)
+    decoded = decode_in_chunks(make_wav(fmt, signal.tobytes()), 101)
+    np.testing.assert_allclose(decoded, signal, atol=1e-7)
+
+
+@pytest.mark.parametrize("chunk_size", [5, 4096])
+def test_44100_hz_wav_is_resampled_to_16000(chunk_size):
+    signal = sine(440, 1.0, 44100)
+    decoded = decode_in_chunks(make_pcm_wav(signal, 44100), chunk_size)
+    assert abs(len(decoded) - 16000) <= 1
+    # The first and last few samples carry the anti-alias filter's edge effect.
+    np.testing.assert_allclose(decoded[8:-8], sine(440, 1.0, 16000)[8:len(decoded) - 8], atol=2e-3)
+
+
+def test_resampler_is_continuous_across_chunk_boundaries():
+    signal = np.linspace(0.0, 1.0, 44100, dtype=np.float32)
+    whole_resampler = _LinearResampler(44100)
+    whole = np.concatenate([whole_resampler.process(signal), whole_resampler.flush()])
+    resampler = _LinearResampler(44100)
+    pieces = [resampler.process(signal[start:start + 997]) for start in range(0, len(signal), 997)] + [resampler.flush()]
+    np.testing.assert_allclose(np.concatenate(pieces), whole[:sum(len(p) for p in pieces)], atol=1e-6)
+    assert abs(sum(len(p) for p in pieces) - len(whole)) <= 1
+
+
+@pytest.mark.parametrize("source_rate", [44100, 48000])
+def test_downsampling_removes_content_above_8_khz(source_rate):
+    # Without the anti-alias filter, a 12 kHz tone would fold back to 4 kHz.
+    resampler = _LinearResampler(source_rate)
+    speech_band = resampler.process(sine(1000, 1.0, source_rate))
+    aliased = _LinearResampler(source_rate).process(sine(12000, 1.0, source_rate))
+    assert np.sqrt(np.mean(speech_band[800:-800] ** 2)) == pytest.approx(0.5 / np.sqrt(2), rel=0.01)
+    assert np.sqrt(np.mean(aliased[800:-800] ** 2)) < 1e-3
+
+
+@pytest.mark.parametrize("chunk_size", [3, 256, 5000])
+def test_ima_adpcm_wav_matches_reference_predictor(chunk_size):
+    source = (sine(300, 0.3, 16000) * 32767).astype(int)
+    wav, expected = encode_ima_adpcm(source)
+    decoded = decode_in_chunks(wav, chunk_size)
+    reference = [(i, value) for i, value in enumerate(expected) if value is not None]
+    assert len(decoded) >= len(source)
+    np.testing.assert_array_equal(
+        np.round(decoded[[i for i, _ in reference]] * 32768).astype(int),
+        [value for _, value in reference],
+    )
+
+
+def test_duration_limit():
+    with pytest.raises(AudioLimitExceeded):
+        decode_in_chunks(make_pcm_wav(sine(440, 2.0, 16000)), 4096, max_duration_seconds=1.0)
+
+
+def test_size_limit_is_checked_before_decoding_everything():
+    decoder = StreamingAudioDecoder(max_bytes=1000)
+    wav = make_pcm_wav(sine(440, 1.0, 16000))
+    with pytest.raises(AudioLimitExceeded):
+        for start in range(0, len(wav), 512):
+            decoder.feed(wav[start:start + 512])
+    assert decoder.bytes_received <= 1024
+
+
+def test_unknown_container_is_unsupported():
+    with pytest.raises(UnsupportedAudioFormat):
+        decode_audio_bytes(b"\x1aE\xdf\xa3" + b"\x00" * 64) # WebM/Matroska magic
+
+
+def test_unsupported_wav_encoding():
+    fmt = struct.pack("<HHIIHH", 0x0001, 1, 16000, 16000 * 3, 3, 24)
+    with pytest.raises(UnsupportedAudioFormat):
+        decode_audio_bytes(make_wav(fmt, b"\x00" * 30))
+
+
+def test_mismatched_block_align_is_a_decode_error():
+    fmt = struct.pack("<HHIIHH", 0x0001, 1, 16000, 16000 * 2, 3, 16)
+    with pytest.raises(AudioDecodeError):
+        decode_audio_bytes(make_wav(fmt, b"\x00" * 30))
+
+
+def test_truncated_and_empty_uploads_are_decode_errors():
+    with pytest.raises(AudioDecodeError):
+        decode_audio_bytes(make_pcm_wav(sine(440, 0.1, 16000))[:30])
+    with pytest.raises(AudioDecodeError):
+        decode_audio_bytes(b"")
+
+
+def test_decode_upload_reads_in_chunks():
+    class FakeUpload:
+        def __init__(self, data):
+            self._stream = io.BytesIO(data)
+            self.reads = 0
+
+        async def read(self, size):
+            self.reads += 1
+            return self._stream.read(size)
+
+    signal = sine(440, 0.5, 16000)
+    upload = FakeUpload(make_pcm_wav(signal))
+    decoded = asyncio.run(decode_upload(upload, chunk_size=1024))
+    np.testing.assert_allclose(decoded, signal, atol=1e-4)
+    assert upload.reads > 1
@@ -0,0 +1,189 @@
+# conci-ai-assistant/backend/tests/test_batch_pipeline.py
+# Tests for the offline batch pipeline: checkpoint/resume, output parts and task replay.
+# Worker processes are replaced by an in-process pool and a fake batch function,
+# so no models are loaded.
+
+import os
+import sys
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.services import batch_pipeline
+from src.services.batch_pipeline import (
+    BatchPipeline, Checkpoint, ResultWriter, TaskReplayer, RESULT_COLUMNS, iter_batches, iter_clips,
+)
+
+
+def fake_process_batch(clips):
+    rows = []
+    for clip in clips:
+        row = dict.fromkeys(name for name, _ in RESULT_COLUMNS)
+        row.update(clip=clip, duration_seconds=1.0, asr_profile="fast", transcript=f"request from {clip}")
+        if "towels" in clip:
+            row.update(task_category="Housekeeping", task_room_number="305", task_priority="medium")
+        rows.append(row)
+    return rows
+
+
+class InProcessPipeline(BatchPipeline):
+    def _make_pool(self):
+        return ThreadPoolExecutor(max_workers=1)
+
+
+@pytest.fixture
+def clips_dir(tmp_path):
+    root = tmp_path / "clips"
+    (root / "day2").mkdir(parents=True)
+    for name in ["a.wav", "towels_1.wav", "b.ogg", "notes.txt", "day2/towels_2.opus", "day2/c.wav"]:
+        (root / name).write_bytes(b"")
+    return str(root)
+
+
+@pytest.fixture(autouse=True)
+def fake_workers(monkeypatch):
+    monkeypatch.setattr(batch_pipeline, "_process_batch", fake_process_batch)
+
+
+def read_dataset(output_dir):
+    import pyarrow.parquet as pq
+    return sorted(row["clip"] for row in pq.read_table(output_dir).to_pylist())
+
+
+def test_iter_clips_walks_lazily_and_skips_completed(clips_dir):
+    clips = list(iter_clips(clips_dir, skip={"b.ogg"}))
+    assert clips == ["a.wav", "towels_1.wav", os.path.join("day2", "c.wav"), os.path.join("day2", "towels_2.opus")]
+    assert list(iter_batches(iter(clips), 3)) == [clips[:3], clips[3:]]
+
+
+def test_result_writer_resume_removes_unrecorded_parts_and_continues_indices(tmp_path):
+    output_dir = str(tmp_path)
+    checkpoint = Checkpoint(output_dir)
+    writer = ResultWriter(output_dir, "parquet", checkpoint)
+    part = writer.write(fake_process_batch(["a.wav"]))
+    checkpoint.record(part, ["a.wav"])
+    writer.write(fake_process_batch(["b.wav"])) # Written but never checkpointed (crash)
+    (tmp_path / "part-00003.parquet.tmp").write_bytes(b"partial")
+
+    checkpoint = Checkpoint(output_dir)
+    writer = ResultWriter(output_dir, "parquet", checkpoint)
+    assert checkpoint.completed_clips == {"a.wav"}
+    assert sorted(os.listdir(output_dir)) == ["_checkpoint.jsonl", "part-00001.parquet"]
+    assert writer.write(fake_process_batch(["b.wav"])) == "part-00002.parquet"
+
+
+def test_truncated_last_checkpoint_line_is_dropped_on_resume(tmp_path):
+    output_dir = str(tmp_path)
+    checkpoint = Checkpoint(output_dir)
+    checkpoint.record("part-00001.parquet", ["a.wav"])
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"part": "part-00002.parquet", "cli') # Crash in the middle of record()
+
+    checkpoint = Checkpoint(output_dir)
+    assert checkpoint.completed_clips == {"a.wav"}
+    checkpoint.record("part-00002.parquet", ["b.wav"])
+    assert Checkpoint(output_dir).completed_clips == {"a.wav", "b.wav"}
+
+
+def test_truncated_last_task_record_is_dropped_and_complete_records_are_kept(tmp_path):
+    path = tmp_path / batch_pipeline.TASKS_FILENAME
+    path.write_text('{"clip": "a.wav", "task_id": "t1"}\n{"clip": "b.wav", "task_id": "t2"}')
+    assert TaskReplayer(str(tmp_path), "http://api").created == {"a.wav": "t1", "b.wav": "t2"}
+    path.write_text('{"clip": "a.wav", "task_id": "t1"}\n{"clip": "b.w')
+    assert TaskReplayer(str(tmp_path), "http://api").created == {"a.wav": "t1"}
+    assert path.read_text() == '{"clip": "a.wav", "task_id": "t1"}\n'
+
+
+def test_corrupt_line_before_other_records_is_an_error(tmp_path):
+    (tmp_path / batch_pipeline.CHECKPOINT_FILENAME).write_text('{"part": \n{"part": "part-00002.parquet", "clips": []}\n')
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmp_path))
+
+
+def test_output_directory_with_parts_but_no_checkpoint_is_refused(tmp_path):
+    (tmp_path / "part-00001.parquet").write_bytes(b"someone else's dataset")
+    with pytest.raises(RuntimeError):
+        ResultWriter(str(tmp_path), "parquet", Checkpoint(str(tmp_path)))
+    assert os.listdir(tmp_path) == ["part-00001.parquet"]
+
+
+def test_dry_run_records_intended_tasks_without_touching_task_manager(clips_dir, tmp_path, monkeypatch):
+    def no_http(*args, **kwargs):
+        raise AssertionError("dry run must not contact the server")
+
+    monkeypatch.setattr(urllib.request, "urlopen", no_http)
+    sys.modules.pop("src.services.task_manager", None)
+    output_dir = str(tmp_path / "out")
+
+    stats = InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, dry_run=True).run()
+
+    assert "src.services.task_manager" not in sys.modules
+    assert stats["clips"] == 5
+    assert stats["tasks_created"] == 0
+    assert not os.path.exists(os.path.join(output_dir, batch_pipeline.TASKS_FILENAME))
+    assert len(read_dataset(output_dir)) == 5
+
+
+def test_resumed_run_skips_completed_clips(clips_dir, tmp_path):
+    output_dir = str(tmp_path / "out")
+    InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, dry_run=True).run()
+    stats = InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, dry_run=True).run()
+    assert stats["clips"] == 0
+    assert len(read_dataset(output_dir)) == 5
+
+
+def test_tasks_are_created_once_across_an_interrupted_run(clips_dir, tmp_path, monkeypatch):
+    posted = []
+
+    def failing_post(self, task):
+        raise OSError("server unavailable")
+
+    def recording_post(self, task):
+        posted.append(task.guest_request)
+        return f"task-{len(posted)}"
+
+    output_dir = str(tmp_path / "out")
+    monkeypatch.setattr(TaskReplayer, "_post_task", failing_post)
+    with pytest.raises(OSError):
+        InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, server_url="http://api").run()
+    assert Checkpoint(output_dir).completed_clips # The batch was checkpointed before task creation failed
+
+    monkeypatch.setattr(TaskReplayer, "_post_task", recording_post)
+    stats = InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, server_url="http://api").run()
+    assert stats["tasks_created"] == 2
+    assert sorted(posted) == sorted(f"request from {clip}" for clip in ["towels_1.wav", os.path.join("day2", "towels_2.opus")])
+
+    stats = InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, server_url="http://api").run()
+    assert stats["tasks_created"] == 0
+    assert len(posted) == 2
+
+
+def test_creating_tasks_requires_a_server_url(tmp_path):
+    with pytest.raises(ValueError):
+        BatchPipeline(str(tmp_path), str(tmp_path / "out"))
+
+
+def test_llm_fallback_uses_a_single_worker(tmp_path):
+    pipeline = BatchPipeline(str(tmp_path), str(tmp_path / "out"), workers=8, dry_run=True, llm_fallback=True)
+    assert pipeline.workers == 1
+
+
+def test_resume_with_another_format_replays_earlier_parts(clips_dir, tmp_path, monkeypatch):
+    def failing_post(self, task):
+        raise OSError("server unavailable")
+
+    output_dir = str(tmp_path / "out")
+    monkeypatch.setattr(TaskReplayer, "_post_task", failing_post)
+    with pytest.raises(OSError):
+        InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, server_url="http://api").run()
+
+    monkeypatch.setattr(TaskReplayer, "_post_task", lambda self, task: "task")
+    stats = InProcessPipeline(clips_dir, output_dir, workers=1, batch_size=2, output_format="arrow",
+                              server_url="http://api").run()
+    assert stats["tasks_created"] == 2
+    parts = sorted(name for name in os.listdir(output_dir) if name.startswith("part-"))
+    assert {os.path.splitext(name)[1] for name in parts} == {".parquet", ".arrow"}
+    assert len(parts) == 3
@@ -0,0 +1,35 @@
+# conci-ai-assistant/backend/tests/test_config.py
+# Tests for settings validation and merging of environment overrides.
+
+import pytest
+from pydantic import ValidationError
+
+from src.core.config import Settings
+
+
+def test_asr_profile_override_is_merged_with_defaults(monkeypatch):
+    monkeypatch.setenv("ASR_PROFILES", '{"fast": {"beam_size": 1}, "night": {"language": "fr"}}')
+    settings = Settings()
+    assert set(settings.ASR_PROFILES) == {"fast", "balanced", "accurate", "night"}
+    assert settings.ASR_PROFILES["fast"].beam_size == 1
+    assert settings.ASR_PROFILES["balanced"].beam_size == 3
+
+
+def test_undefined_default_asr_profile_fails_at_startup(monkeypatch):
+    monkeypatch.setenv("ASR_DEFAULT_PROFILE", "turbo")
+    with pytest.raises(ValidationError, match="ASR_DEFAULT_PROFILE"):
+        Settings()
+
+
+def test_undefined_device_asr_profile_fails_at_startup(monkeypatch):
+    monkeypatch.setenv("ASR_DEVICE_PROFILES", '{"room-305": "turbo"}')
+    with pytest.raises(ValidationError, match="room-305"):
+        Settings()
+
+
+def test_stage_resources_override_keeps_other_stages(monkeypatch):
+    monkeypatch.setenv("STAGE_RESOURCES", '{"llm": {"threads": 6, "cores": [2, 3, 4, 5, 6, 7]}}')
+    settings = Settings()
+    assert set(settings.STAGE_RESOURCES) == {"asr", "llm", "tts"}
+    assert settings.STAGE_RESOURCES["llm"].threads == 6
+    assert settings.STAGE_RESOURCES["asr"].threads is None
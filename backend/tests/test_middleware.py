@@ -0,0 +1,49 @@
+# conci-ai-assistant/backend/tests/test_middleware.py
+# Tests for the upload size limit middleware.
+
+from fastapi import FastAPI, UploadFile, File
+from fastapi.testclient import TestClient
+
+from src.api.middleware import UploadSizeLimitMiddleware
+
+
+def make_client(max_body_bytes: int) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=max_body_bytes, paths=["/upload/"])
+
+    @app.post("/upload/")
+    async def upload(audio_file: UploadFile = File(...)):
+        return {"size": len(await audio_file.read())}
+
+    @app.post("/other/")
+    async def other(audio_file: UploadFile = File(...)):
+        return {"size": len(await audio_file.read())}
+
+    return TestClient(app)
+
+
+def test_upload_within_limit_passes():
+    response = make_client(10_000).post("/upload/", files={"audio_file": ("a.wav", b"x" * 1000, "audio/wav")})
+    assert response.status_code == 200
+    assert response.json() == {"size": 1000}
+
+
+def test_oversized_content_length_is_rejected():
+    response = make_client(10_000).post("/upload/", files={"audio_file": ("a.wav", b"x" * 50_000, "audio/wav")})
+    assert response.status_code == 413
+
+
+def test_oversized_chunked_body_is_rejected():
+    def chunks():
+        for _ in range(50):
+            yield b"x" * 1000
+
+    response = make_client(10_000).post(
+        "/upload/", content=chunks(), headers={"Content-Type": "multipart/form-data; boundary=abc"}
+    )
+    assert response.status_code == 413
+
+
+def test_other_paths_are_not_limited():
+    response = make_client(10_000).post("/other/", files={"audio_file": ("a.wav", b"x" * 50_000, "audio/wav")})
+    assert response.status_code == 200
@@ -0,0 +1,53 @@
+# conci-ai-assistant/backend/tests/test_resource_manager.py
+# Tests for per-stage thread budgets and queue-depth rebalancing.
+
+from src.core.config import StageResources
+from src.services.resource_manager import ResourceManager
+
+
+def make_manager(**kwargs) -> ResourceManager:
+    stages = {"asr": StageResources(), "llm": StageResources(threads=6), "tts": StageResources(cores=[0])}
+    return ResourceManager(stage_resources=stages, total_threads=8, enabled=True, **kwargs)
+
+
+def test_base_budgets_use_equal_share_and_affinity_caps():
+    assert make_manager().base_budgets() == {"asr": 2, "llm": 6, "tts": 1}
+
+
+def test_without_rebalancing_budgets_are_fixed():
+    manager = make_manager(rebalance=False)
+    manager._queue_depths.update(asr=5)
+    assert manager.budget_for("asr") == 2
+
+
+def test_idle_stage_cores_go_to_the_busy_stage():
+    manager = make_manager(rebalance=True)
+    assert manager.budget_for("asr") == 8
+    assert manager.budget_for("tts") == 1 # Capped by its affinity set
+
+
+def test_busy_stages_share_in_proportion_to_budget_and_depth():
+    manager = make_manager(rebalance=True)
+    manager._queue_depths.update(asr=1, llm=1)
+    assert manager.budget_for("asr") == 2 # 8 * 2 / (2 + 6)
+    assert manager.budget_for("llm") == 6
+    manager._queue_depths.update(asr=3)
+    assert manager.budget_for("asr") == 4 # 8 * 6 / (6 + 6)
+
+
+def test_threads_held_by_running_calls_are_not_handed_out_again():
+    manager = make_manager(rebalance=True)
+    manager._queue_depths.update(llm=1)
+    manager._granted.update(llm=8) # An LLM call started alone and took every core
+    manager._queue_depths.update(asr=1)
+    assert manager.budget_for("asr") == 1 # Only min_threads while the LLM call holds all 8
+    manager._granted.update(llm=6)
+    assert manager.budget_for("asr") == 2
+    manager._granted.update(llm=0)
+    assert manager.budget_for("asr") == 2 # 8 * 2 / (2 + 6) while the LLM is still queued
+
+
+def test_fixed_budgets_are_also_limited_by_held_threads():
+    manager = make_manager(rebalance=False)
+    manager._granted.update(asr=4)
+    assert manager.budget_for("llm") == 4